@@ -0,0 +1,164 @@
+from typing import Callable, List
+from configparser import ConfigParser
+import os
+import random
+
+from buildutils import BuildConfiguration
+from buildutils.commands import Command
+from buildutils.plugins import Plugin, PluginConfigHelper, as_plugin
+from buildutils.source_index import SourceIndex
+
+
+class Benchmark:
+
+    """
+    A single benchmark case. The setup function prepares any data the benchmark requires and returns the function
+    whose execution time will be measured. Any files must be written within the temporary directory passed to setup
+    which is deleted once the benchmark has been measured.
+    """
+
+    def __init__(self, name: str, description: str, setup: Callable[[int, str], Callable[[], None]]):
+        self.name = name
+        self.description = description
+        self.setup = setup
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, description: str):
+    def register(setup: Callable[[int, str], Callable[[], None]]):
+        BENCHMARKS.append(Benchmark(name, description, setup))
+        return setup
+    return register
+
+
+def _no_op() -> bool:
+    return True
+
+
+@benchmark('plugin-registry', 'Build with thousands of registered no-op plugins, dominated by plugin lookups.')
+def _plugin_registry(scale: int, directory: str) -> Callable[[], None]:
+    plugin_count = 2000 * scale
+    plugins = [as_plugin(f'plugin-{index}', 'A no-op plugin.', _no_op) for index in range(plugin_count)]
+    config_file = os.path.join(directory, 'build.ini')
+    with open(config_file, 'w') as file:
+        file.write('[UNUSED]\nvalue = 1\n')
+
+    def run():
+        configuration = BuildConfiguration().config(config_file).plugins(*plugins)
+        current_directory = os.getcwd()
+        os.chdir(directory)
+        try:
+            configuration.build()
+        finally:
+            os.chdir(current_directory)
+    return run
+
+
+@benchmark('config-loading', 'Parse a build.ini file containing thousands of plugin sections.')
+def _config_loading(scale: int, directory: str) -> Callable[[], None]:
+    section_count = 5000 * scale
+    config_file = os.path.join(directory, 'build.ini')
+    with open(config_file, 'w') as file:
+        for index in range(section_count):
+            file.write(f'[STEP_{index}]\ncommand = echo {index}\nexpected_status = 0,1\npaths = a,b,c\n\n')
+    return lambda: BuildConfiguration().config(config_file)._load_config_parser()
+
+
+@benchmark('config-helper', 'Read string, bool, int and list properties through PluginConfigHelper.')
+def _config_helper(scale: int, directory: str) -> Callable[[], None]:
+    plugin = as_plugin('HELPER', 'A no-op plugin.', _no_op)
+    config = ConfigParser()
+    config.read_dict({'HELPER': {'command': 'echo', 'enabled': 'true', 'count': '10', 'statuses': '0,1,2'}})
+    iterations = 50000 * scale
+
+    def run():
+        helper = PluginConfigHelper(plugin, config)
+        for _ in range(iterations):
+            helper.prop('command')
+            helper.bool_prop('enabled')
+            helper.int_prop('count')
+            helper.int_list_prop('statuses')
+            helper.prop('missing', 'default')
+    return run
+
+
+@benchmark('coverage-report-check', 'Check the total of a synthetic coverage report with thousands of modules.')
+def _coverage_report_check(scale: int, directory: str) -> Callable[[], None]:
+    from buildutils.plugins.coverage import _CoverageCheckCommand
+
+    module_count = 5000 * scale
+    report_file = os.path.join(directory, 'index.html')
+    with open(report_file, 'w') as file:
+        file.write('<html><body><table><tbody>\n')
+        for index in range(module_count):
+            file.write(f'<tr class="region"><td class="name left"><a href="m{index}.html">module_{index}.py</a></td>'
+                       f'<td>100</td><td>10</td><td>0</td><td class="right" data-ratio="90 100">90%</td></tr>\n')
+        file.write('</tbody><tfoot><tr class="total"><td class="name left">Total</td><td>1</td><td>1</td><td>0</td>'
+                   '<td class="right" data-ratio="90 100">90%</td></tr></tfoot></table></body></html>\n')
+    command = _CoverageCheckCommand(report_file, 80)
+    return lambda: command.execute()
+
+
+@benchmark('flake-classification', 'Parse and classify millions of lines of flake8 output.')
+def _flake_classification(scale: int, directory: str) -> Callable[[], None]:
+    from buildutils.plugins.flake import _FlakeCommand
+
+    line_count = 1000000 * scale
+    generator = random.Random(0)
+    codes = ['W291', 'W293', 'C901', 'E501', 'F401']
+    output = '\n'.join(
+        f'package/module_{index % 500}.py:{index}:{generator.randint(1, 120)}: {generator.choice(codes)} message {index}'
+        for index in range(line_count)
+    )
+    command = _FlakeCommand('flake8', True, {'E501': line_count}, None)
+
+    def run():
+        command._check_diagnostics(command._parse_diagnostics(output))
+    return run
+
+
+class _NoOpCommand(Command):
+
+    def execute(self) -> bool:
+        return True
+
+
+class _NoOpPlugin(Plugin):
+
+    def __init__(self, command_count: int):
+        super().__init__('no-op', 'A plugin executing only no-op commands.')
+        for index in range(command_count):
+            self._use_command(_NoOpCommand(f'no-op-{index}'))
+
+    def load_config(self, config: ConfigParser):
+        pass
+
+
+@benchmark('scheduler-overhead', 'Execute a plugin containing thousands of no-op commands.')
+def _scheduler_overhead(scale: int, directory: str) -> Callable[[], None]:
+    plugin = _NoOpPlugin(20000 * scale)
+    return lambda: plugin.execute()
+
+
+@benchmark('source-index', 'Refresh a persisted source index of a tree containing thousands of files.')
+def _source_index(scale: int, directory: str) -> Callable[[], None]:
+    for package_index in range(50 * scale):
+        package_directory = os.path.join(directory, f'package_{package_index}')
+        os.makedirs(package_directory)
+        for module_index in range(100):
+            with open(os.path.join(package_directory, f'module_{module_index}.py'), 'w') as file:
+                file.write(f'value = {module_index}\n')
+
+    def run():
+        current_directory = os.getcwd()
+        os.chdir(directory)
+        try:
+            index = SourceIndex()
+            index.refresh()
+            index.changed_files('*.py', 'package_0')
+            index.save()
+        finally:
+            os.chdir(current_directory)
+    return run
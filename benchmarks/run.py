@@ -0,0 +1,114 @@
+"""Runs the buildutils framework benchmarks and compares the results against a saved baseline.
+
+Usage:
+    python -m benchmarks.run                    Run all benchmarks and compare against the baseline if one exists.
+    python -m benchmarks.run --save-baseline    Run all benchmarks and save the results as the new baseline.
+    python -m benchmarks.run --filter flake     Run only the benchmarks whose names contain 'flake'.
+"""
+
+from typing import Dict, List
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.cases import BENCHMARKS, Benchmark
+
+
+_RESULTS_DIRECTORY = os.path.join(os.path.dirname(__file__), 'results')
+_BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def _measure(case: Benchmark, scale: int, repeat: int) -> Dict[str, float]:
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), tempfile.TemporaryDirectory() as directory:
+        function = case.setup(scale, directory)
+        function()  # Warm up caches and lazily imported modules before measuring.
+        timings = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+    return {'min': min(timings), 'median': statistics.median(timings)}
+
+
+def _compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    regressions = []
+    print(f'\n{"benchmark".ljust(24)} {"baseline".rjust(10)} {"current".rjust(10)} {"change".rjust(8)}')
+    for name, result in results.items():
+        if name not in baseline:
+            print(f'{name.ljust(24)} {"-".rjust(10)} {result["min"]:>9.4f}s {"new".rjust(8)}')
+            continue
+        previous = baseline[name]['min']
+        change = (result['min'] - previous) / previous if previous > 0 else 0
+        flag = ' REGRESSION' if change > threshold else ''
+        print(f'{name.ljust(24)} {previous:>9.4f}s {result["min"]:>9.4f}s {change:>+7.1%}{flag}')
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(arguments: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Run the buildutils framework benchmarks.')
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose names contain this value.')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of measured runs of each benchmark.')
+    parser.add_argument('--scale', type=int, default=1, help='Multiplies the size of the data used by each benchmark.')
+    parser.add_argument('--threshold', type=float, default=0.2, help='The relative slowdown reported as a regression.')
+    parser.add_argument('--save-baseline', action='store_true', help='Save the results as the new baseline.')
+    options = parser.parse_args(arguments)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for case in BENCHMARKS:
+        if options.filter not in case.name:
+            continue
+        print(f'Running [{case.name}] - {case.description}')
+        try:
+            results[case.name] = _measure(case, options.scale, options.repeat)
+        except ImportError as e:
+            print(f'Skipping [{case.name}] as a required package is not installed: [{e}]')
+            continue
+        print(f'\tmin [{results[case.name]["min"]:.4f}]s median [{results[case.name]["median"]:.4f}]s')
+
+    document = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': options.scale,
+        'results': results,
+    }
+    os.makedirs(_RESULTS_DIRECTORY, exist_ok=True)
+    results_file = os.path.join(_RESULTS_DIRECTORY, f'{datetime.datetime.now():%Y%m%d-%H%M%S}.json')
+    with open(results_file, 'w') as file:
+        json.dump(document, file, indent=2)
+    print(f'Results have been written to [{results_file}]')
+
+    if options.save_baseline:
+        with open(_BASELINE_FILE, 'w') as file:
+            json.dump(document, file, indent=2)
+        print(f'Baseline has been saved to [{_BASELINE_FILE}]')
+        return 0
+
+    if not os.path.isfile(_BASELINE_FILE):
+        print('No baseline exists to compare against. Run with --save-baseline to create one.')
+        return 0
+    with open(_BASELINE_FILE, 'r') as file:
+        baseline = json.load(file)
+    if baseline.get('scale') != options.scale:
+        print(f'The baseline was recorded with a scale of [{baseline.get("scale")}] and cannot be compared.')
+        return 1
+    regressions = _compare(results, baseline['results'], options.threshold)
+    if len(regressions) > 0:
+        print(f'The following benchmarks regressed by more than [{options.threshold:.0%}]: [{regressions}]')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -7,7 +7,12 @@ from buildutils.plugins import FlakePlugin, GenericCommandPlugin, EnsureVenvActi
 @click.option('--profile', '-pr')
 @click.option('--plugins', '-p')
 @click.option('--list-plugins', '-l', is_flag=True)
-def main(profile: str, plugins: str, list_plugins: bool):
+@click.option('--profile-commands')
+@click.option('--profile-mode', type=click.Choice(['cpu', 'memory', 'all']), default='all')
+@click.option('--resume', is_flag=True)
+@click.option('--plan', is_flag=True)
+@click.option('--jobs', type=int, default=1)
+def main(profile: str, plugins: str, list_plugins: bool, profile_commands: str, profile_mode: str, resume: bool, plan: bool, jobs: int):
     (
         BuildConfiguration()
         .config('build.ini')
@@ -20,7 +25,7 @@ def main(profile: str, plugins: str, list_plugins: bool):
                 GenericCommandPlugin('GENERATE_DOCS', 'Generate documentation from inline comments using Sphinx')
             )
         )
-        .build(profile, plugins, list_plugins)
+        .build(profile, plugins, list_plugins, profile_commands, profile_mode, resume, plan, jobs)
     )
 
 
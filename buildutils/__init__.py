@@ -1 +1,3 @@
 from .runner import BuildConfiguration
+from .multi_project import MultiProjectBuild
+from .matrix import MatrixBuild
@@ -0,0 +1,25 @@
+import argparse
+import sys
+
+from buildutils.remote import run_worker
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='buildutils')
+    subcommands = parser.add_subparsers(dest='subcommand', required=True)
+
+    worker = subcommands.add_parser('worker', help='Start a worker that executes commands sent by a build coordinator.')
+    worker.add_argument('--host', default='127.0.0.1', help='The interface to listen on.')
+    worker.add_argument('--port', type=int, default=8765, help='The port to listen on.')
+    worker.add_argument('--token', default='', help='A secret the coordinator must send along with every command. Required unless the host is a loopback interface.')
+
+    options = parser.parse_args(arguments)
+    if options.subcommand == 'worker':
+        try:
+            run_worker(options.host, options.port, options.token)
+        except ValueError as e:
+            parser.error(str(e))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
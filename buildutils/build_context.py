@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Callable
+from configparser import ConfigParser
+
+from buildutils.source_index import SourceIndex, DEFAULT_IGNORE_PATTERNS
+
+
+class BuildContext:
+
+    """State shared by every plugin of a single build. Plugins can access the context of the running build, from
+    either load_config or execute, through get_build_context.
+
+    The source index is only created the first time it is requested, so builds whose plugins do not use it do not pay
+    for walking the source tree. It is configured through the optional SOURCE_INDEX section of the configuration file
+    which can contain the properties 'root', 'ignore', and 'workers'.
+
+    root: The directory to index. Defaults to the current directory.
+
+    ignore: A comma delimited list of glob patterns of the files and directories that should not be indexed. Defaults
+    to common version control, virtual environment, cache, and build output directories.
+
+    workers: The number of threads used to walk the source tree.
+    """
+
+    _SECTION_NAME = 'SOURCE_INDEX'
+
+    def __init__(self, config_loader: Callable[[], ConfigParser]):
+        """
+        Initializes the build context.
+
+        Args:
+            config_loader (Callable[[], ConfigParser]): Returns the configuration of the build.
+        """
+
+        self._config_loader = config_loader
+        self._source_index: SourceIndex | None = None
+
+    @property
+    def source_index(self) -> SourceIndex:
+        if self._source_index is None:
+            config = self._config_loader()
+            section = config[BuildContext._SECTION_NAME] if BuildContext._SECTION_NAME in config else {}
+            ignore_patterns = list(DEFAULT_IGNORE_PATTERNS)
+            if 'ignore' in section:
+                ignore_patterns = [pattern.strip() for pattern in section['ignore'].split(',') if pattern.strip() != '']
+            workers = int(section['workers']) if 'workers' in section else None
+            self._source_index = SourceIndex(section.get('root', '.'), ignore_patterns, workers)
+            self._source_index.refresh()
+        return self._source_index
+
+    def save(self):
+        """
+        Persists the state that should carry over to the next build. Only called once every plugin completed
+        successfully so the files changed in a failed build are still reported as changed by the next build.
+        """
+
+        if self._source_index is not None:
+            self._source_index.save()
+
+
+_active_context: BuildContext | None = None
+
+
+def get_build_context() -> BuildContext | None:
+    """
+    Gets the context of the build currently being executed or None if no build is being executed.
+    """
+
+    return _active_context
+
+
+def set_build_context(context: BuildContext | None):
+    global _active_context
+    _active_context = context
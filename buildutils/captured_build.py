@@ -0,0 +1,46 @@
+from typing import Callable, Tuple
+import os
+import sys
+import tempfile
+
+
+def run_captured_build(build: Callable[[], None], label: str) -> Tuple[bool, str]:
+    """
+    Runs a build function, typically from within a worker process, while capturing everything written to stdout and
+    stderr, including the output of any subprocesses started by the build.
+
+    Args:
+        build (Callable[[], None]): The function that executes the build. A build is considered to have failed if the
+            function exits with a non-zero status or raises an exception.
+        label (str): A name identifying the build used when reporting an uncaught exception.
+
+    Returns:
+        A tuple containing True if the build succeeded, otherwise False, and the captured output.
+    """
+
+    success = True
+    with tempfile.TemporaryFile(mode='w+') as capture:
+        # Redirect at the file descriptor level so the output of subprocesses started by the plugins is captured too.
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved_stdout = os.dup(1)
+        saved_stderr = os.dup(2)
+        os.dup2(capture.fileno(), 1)
+        os.dup2(capture.fileno(), 2)
+        try:
+            build()
+        except SystemExit as e:
+            success = e.code in [None, 0]
+        except Exception as e:
+            print(f'An uncaught exception occurred while building [{label}]')
+            print(e)
+            success = False
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_stdout, 1)
+            os.dup2(saved_stderr, 2)
+            os.close(saved_stdout)
+            os.close(saved_stderr)
+        capture.seek(0)
+        return success, capture.read()
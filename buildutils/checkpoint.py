@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Dict, List, TextIO
+import glob
+import json
+import os
+
+from buildutils.build_context import get_build_context
+from buildutils.commands import fingerprint, matrix_artifact_path
+
+
+class BuildCheckpoint:
+
+    """
+    Keeps track of the plugins that have completed successfully so a failed build can be resumed from the plugin that
+    failed rather than from the first plugin.
+
+    The checkpoint is tied to a hash of the configuration file and the order of the plugins being executed. Each
+    completed plugin is recorded as it completes and, once a build stops before all of its plugins completed, a
+    fingerprint of the input files of each completed plugin is recorded as well. A resumed build compares these
+    fingerprints against the input files before any plugin executes, so a plugin is only skipped when its inputs have
+    not changed since the failed build stopped. Builds that complete successfully never compute the fingerprints.
+
+    The input files of a plugin are specified by the optional 'inputs' property, a comma delimited list of glob
+    patterns, within the plugin's section of the configuration file. The patterns are matched against the files of the
+    build's source index. A plugin that does not declare its inputs is fingerprinted using every file within the
+    source index, so it is only skipped when nothing in the project changed since the failed build stopped.
+    """
+
+    _FILE_NAME = '.buildutils-checkpoint.json'
+    _INPUTS_PROPERTY = 'inputs'
+    _ALL_FILES_PATTERN = '**/*'
+
+    def __init__(self, config_file: str, plugins_to_execute: List[str], input_patterns: Dict[str, List[str]]):
+        """
+        Initializes the checkpoint.
+
+        Args:
+            config_file (str): The path to the configuration file the build was configured from.
+            plugins_to_execute (List[str]): The names of the plugins in the order they are to be executed.
+            input_patterns (Dict[str, List[str]]): The glob patterns of the input files of each plugin keyed by the
+                name of the plugin.
+        """
+
+        self._file_name = matrix_artifact_path(BuildCheckpoint._FILE_NAME)
+        self._config_hash = fingerprint([config_file], plugins_to_execute)
+        self._input_patterns = input_patterns
+        self._previous: Dict[str, str] | None = None
+        self._completed: List[str] = []
+        self._fingerprints: Dict[str, str] = {}
+        self._file: TextIO | None = None
+
+    @staticmethod
+    def read_input_patterns(section: Dict[str, str] | None) -> List[str]:
+        if section is None or BuildCheckpoint._INPUTS_PROPERTY not in section:
+            return []
+        return [pattern.strip() for pattern in section[BuildCheckpoint._INPUTS_PROPERTY].split(',') if pattern.strip() != '']
+
+    def load(self):
+        """
+        Loads the plugins completed by a previous build. The previous checkpoint is discarded if the configuration or
+        the plugins being executed have changed since, or if the previous build was stopped before it could record the
+        fingerprints of its inputs.
+        """
+
+        if not os.path.isfile(self._file_name):
+            print('No checkpoint from a previous build was found.')
+            return
+        with open(self._file_name, 'r') as file:
+            try:
+                entries = [json.loads(line) for line in file if line.strip() != '']
+            except ValueError:
+                print(f'Ignoring unreadable checkpoint file [{self._file_name}]')
+                return
+        if len(entries) == 0 or entries[0].get('config_hash') != self._config_hash:
+            print('The configuration or selected plugins have changed since the last build. Ignoring checkpoint.')
+            return
+        if 'fingerprints' not in entries[-1]:
+            print('The previous build stopped without recording the fingerprints of its inputs. Ignoring checkpoint.')
+            return
+        self._previous = entries[-1]['fingerprints']
+
+    def can_skip(self, plugin_name: str) -> bool:
+        """
+        Checks if the plugin completed successfully in the previous build and its input files have not changed since.
+
+        Once a plugin cannot be skipped no subsequent plugin will be skipped either since the subsequent plugins may
+        depend on the outputs of the plugin that is about to be executed. This also means the fingerprints are always
+        computed before any plugin of the resumed build has modified the files.
+        """
+
+        if self._previous is None:
+            return False
+        if plugin_name in self._previous and self._previous[plugin_name] == self._inputs_fingerprint(plugin_name):
+            return True
+        self._previous = None
+        return False
+
+    def mark_completed(self, plugin_name: str):
+        # The checkpoint is written as one JSON entry per line so each completed plugin is a single append rather than
+        # a rewrite of every previously completed plugin.
+        if self._file is None:
+            self._file = open(self._file_name, 'w')
+            self._write({'config_hash': self._config_hash})
+        self._write({'plugin': plugin_name})
+        self._completed.append(plugin_name)
+
+    def record_fingerprints(self):
+        """
+        Records the fingerprints of the inputs of each completed plugin. Called once the build stops before all of its
+        plugins completed so the files modified by the completed plugins are part of the recorded fingerprints.
+        """
+
+        if self._file is None:
+            return
+        context = get_build_context()
+        if context is not None:
+            # Walked again since the completed plugins may have modified files after the index was created.
+            context.source_index.refresh('')
+        self._fingerprints = {}
+        self._write({'fingerprints': {plugin_name: self._inputs_fingerprint(plugin_name) for plugin_name in self._completed}})
+        self._file.close()
+        self._file = None
+
+    def clear(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.isfile(self._file_name):
+            os.remove(self._file_name)
+
+    def _inputs_fingerprint(self, plugin_name: str) -> str:
+        patterns = self._input_patterns.get(plugin_name) or [BuildCheckpoint._ALL_FILES_PATTERN]
+        key = ','.join(patterns)
+        if key not in self._fingerprints:
+            context = get_build_context()
+            directory = context.source_index.relative_path('.') if context is not None else None
+            if directory is not None:
+                # The patterns are relative to the current directory which may be below the root of the index.
+                prefix = directory + '/' if directory != '' else ''
+                index = context.source_index
+                paths = [entry.path for entry in index.files([prefix + pattern for pattern in patterns])]
+                self._fingerprints[key] = index.fingerprint(paths)
+            else:
+                paths = set()
+                for pattern in patterns:
+                    paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+                self._fingerprints[key] = fingerprint(sorted(paths))
+        return self._fingerprints[key]
+
+    def _write(self, entry: Dict):
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
@@ -1,3 +1,13 @@
-from .command_string import parse_python_command_string
+from .command_string import parse_python_command_string, use_python_environment, executables_directory
 from .command import Command
+from .fingerprint import fingerprint
 from .function_command import FunctionCommand, as_command
+from .matrix_cell import MATRIX_CELL_VARIABLE, matrix_artifact_path
+from .process_environment import (
+    export_environment_variable,
+    get_exported_environment_variable,
+    get_exported_environment_variables,
+    remove_exported_environment_variable,
+    clear_exported_environment_variables,
+    get_process_environment
+)
@@ -1,3 +1,5 @@
+from typing import Tuple
+import os
 import sys
 from pathlib import Path
 
@@ -5,6 +7,37 @@ from pathlib import Path
 _PYTHON_TEMPLATE = '{PYTHON_VENV}'
 _PIP_TEMPLATE = '{PIP_VENV}'
 
+_python_environment: Tuple[str, str] | None = None
+
+
+def executables_directory(prefix: str) -> Path:
+    """
+    Gets the directory containing the python and pip executables of a virtual environment. This is the Scripts
+    directory on Windows and the bin directory everywhere else.
+    """
+
+    return Path(prefix).joinpath('Scripts' if os.name == 'nt' else 'bin')
+
+
+def use_python_environment(path: str | None):
+    """
+    Overrides the interpreter the {PYTHON_VENV} and {PIP_VENV} placeholders are substituted with. This is used when
+    running a build against an interpreter other than the one executing the build, such as when running a matrix build.
+
+    Args:
+        path (str): Either the path to the root directory of a virtual environment or the path to a python executable.
+            When None the placeholders will be resolved from the currently active virtual environment.
+    """
+
+    global _python_environment
+    if path is None:
+        _python_environment = None
+    elif os.path.isdir(path):
+        executables = executables_directory(path)
+        _python_environment = (str(executables.joinpath('python')), str(executables.joinpath('pip')))
+    else:
+        _python_environment = (path, f'{path} -m pip')
+
 
 def parse_python_command_string(command: str) -> str:
     """
@@ -14,8 +47,14 @@ def parse_python_command_string(command: str) -> str:
     absolute path to the python binary.
     """
 
-    if sys.prefix == sys.base_prefix or (_PYTHON_TEMPLATE not in command and _PIP_TEMPLATE not in command):
+    if _PYTHON_TEMPLATE not in command and _PIP_TEMPLATE not in command:
+        return command
+    if _python_environment is not None:
+        (python_executable_path, pip_executable_path) = _python_environment
+    elif sys.prefix == sys.base_prefix:
         return command
-    python_executable_path = str(Path(sys.prefix).joinpath('Scripts').joinpath('python'))
-    pip_executable_path = str(Path(sys.prefix).joinpath('Scripts').joinpath('pip'))
+    else:
+        executables = executables_directory(sys.prefix)
+        python_executable_path = str(executables.joinpath('python'))
+        pip_executable_path = str(executables.joinpath('pip'))
     return command.replace(_PYTHON_TEMPLATE, python_executable_path).replace(_PIP_TEMPLATE, pip_executable_path)
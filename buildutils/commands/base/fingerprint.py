@@ -0,0 +1,37 @@
+from typing import List
+import hashlib
+import os
+
+
+_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def fingerprint(paths: List[str], extra_values: List[str] | None = None) -> str:
+    """
+    Computes a SHA-256 digest from the path and contents of each file along with any additional values provided.
+
+    Missing files are included in the digest as missing so that creating or deleting one of the files will produce
+    a different fingerprint.
+
+    Args:
+        paths (List[str]): The relative or absolute paths of the files to include in the fingerprint.
+        extra_values (List[str]): Additional values, such as the interpreter version, to include in the fingerprint.
+
+    Returns:
+        The hex encoded digest.
+    """
+
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode('utf-8'))
+        if not os.path.isfile(path):
+            digest.update(b'\0missing\0')
+            continue
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(_READ_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        digest.update(b'\0')
+    for value in extra_values or []:
+        digest.update(value.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
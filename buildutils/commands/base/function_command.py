@@ -1,6 +1,11 @@
 from typing import Callable
+from concurrent.futures.process import BrokenProcessPool
+import pickle
+
+from buildutils.profiling import get_active_profiler
 
 from .command import Command
+from .process_pool import get_process_pool, shutdown_process_pool, call_in_worker
 
 
 class FunctionCommand(Command):
@@ -9,17 +14,57 @@ class FunctionCommand(Command):
     A bare-bones command that wraps a function, so it can be executed as part of a plugin.
     """
 
-    def __init__(self, name: str, function: Callable[[], bool]):
+    def __init__(self, name: str, function: Callable[[], bool], isolated: bool = False):
+        """
+        Initializes the function command.
+
+        Args:
+            name (str): The name of the command.
+            function (Callable[[], bool]): The function to execute. The function should return True if it completed
+                successfully, otherwise False.
+            isolated (bool): If True the function will be executed in a worker process from a shared process pool
+                rather than in the build process. The function, and its return value, must be picklable which means
+                the function must be defined at the module level. Isolated commands are not profiled.
+        """
+
         super().__init__(name)
         self._function = function
+        self._isolated = isolated
 
     def execute(self) -> bool:
-        return self._function()
+        if self._isolated:
+            return self._execute_in_worker()
+        profiler = get_active_profiler()
+        if profiler is None or not profiler.should_profile(self.name):
+            return self._function()
+        return profiler.profile(self.name, self._function)
 
+    def _execute_in_worker(self) -> bool:
+        print(f'Executing command [{self.name}] in a worker process')
+        try:
+            (completed, value) = get_process_pool().submit(call_in_worker, self._function).result()
+        except BrokenProcessPool:
+            print(f'The worker process executing command [{self.name}] terminated abruptly.')
+            # A broken pool cannot accept any more work so it is discarded and recreated for the next isolated command.
+            shutdown_process_pool()
+            return False
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            print(f'The function or result of command [{self.name}] could not be sent between processes: [{e}]')
+            return False
 
-def as_command(name: str, function: Callable[[], bool]) -> Command:
+        if not completed:
+            print(f'An uncaught exception occurred in the worker process executing command [{self.name}]')
+            print(value)
+            return False
+        return value
+
+
+def as_command(name: str, function: Callable[[], bool], isolated: bool = False) -> Command:
     """
     Wraps a function in a command, so it can be executed as part of a plugin in the build process.
+
+    When isolated is True the function will be executed in a worker process, so CPU bound functions do not block the
+    build process and a crash within the function is reported as a command failure.
     """
 
-    return FunctionCommand(name, function)
+    return FunctionCommand(name, function, isolated)
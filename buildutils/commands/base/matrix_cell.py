@@ -0,0 +1,17 @@
+import os
+
+
+MATRIX_CELL_VARIABLE = 'BUILDUTILS_MATRIX_CELL'
+
+
+def matrix_artifact_path(path: str) -> str:
+    """
+    Gets the path a build artifact should be written to. When executed as part of a matrix build the name of the
+    current matrix cell will be appended to the path, so each cell writes to its own artifacts, otherwise the original
+    path will be returned unchanged.
+    """
+
+    cell = os.environ.get(MATRIX_CELL_VARIABLE)
+    if cell is None:
+        return path
+    return f'{path}.{cell}'
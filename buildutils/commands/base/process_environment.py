@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Dict
+import os
+
+
+_exported_variables: Dict[str, str] = {}
+
+
+def export_environment_variable(name: str, value: str):
+    """
+    Exports an environment variable to every subprocess started by a process command for the remainder of the build
+    without modifying the environment of the build process itself.
+    """
+
+    _exported_variables[name] = value
+
+
+def get_exported_environment_variable(name: str) -> str | None:
+    return _exported_variables.get(name)
+
+
+def get_exported_environment_variables() -> Dict[str, str]:
+    return dict(_exported_variables)
+
+
+def remove_exported_environment_variable(name: str):
+    _exported_variables.pop(name, None)
+
+
+def clear_exported_environment_variables():
+    _exported_variables.clear()
+
+
+def get_process_environment() -> Dict[str, str] | None:
+    """
+    Gets the environment subprocesses should be started with. When no variables have been exported this returns None
+    so the subprocess simply inherits the environment of the build process.
+    """
+
+    if len(_exported_variables) == 0:
+        return None
+    environment = dict(os.environ)
+    environment.update(_exported_variables)
+    return environment
@@ -0,0 +1,48 @@
+from typing import Any, Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import atexit
+import traceback
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Gets the process pool used to execute isolated function commands. The pool is created on first use and reused by
+    every isolated command for the remainder of the build.
+    """
+
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor()
+        atexit.register(shutdown_process_pool)
+    return _pool
+
+
+def shutdown_process_pool():
+    """
+    Shuts down the process pool, if one has been created. A new pool will be created the next time one is required.
+    This is also used to discard a pool whose worker processes have crashed.
+    """
+
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def call_in_worker(function: Callable[[], Any]) -> Tuple[bool, Any]:
+    """
+    Executes the function within a pool worker process. Exceptions are caught within the worker since not every
+    exception, or its traceback, can be pickled and sent back to the build process.
+
+    Returns:
+        A tuple of True and the value returned by the function if the function completed. Otherwise, a tuple of False
+        and the formatted traceback of the exception raised by the function.
+    """
+
+    try:
+        return True, function()
+    except Exception:
+        return False, traceback.format_exc()
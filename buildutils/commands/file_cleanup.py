@@ -25,7 +25,10 @@ class FileCleanupCommand(Command):
 
     def execute(self) -> bool:
         for path in self._paths:
-            if os.path.isfile(path):
+            if os.path.islink(path):
+                print(f'Cleaning up link [{path}]')
+                os.remove(path)
+            elif os.path.isfile(path):
                 print(f'Cleaning up file [{path}]')
                 os.remove(path)
             elif os.path.isdir(path):
@@ -1,7 +1,11 @@
 from typing import List
+import os
+import shlex
 import subprocess
 
-from .base import Command, parse_python_command_string
+from buildutils.remote import get_active_dispatcher
+
+from .base import Command, parse_python_command_string, get_process_environment
 
 
 class StatusBasedProcessCommand(Command):
@@ -38,8 +42,13 @@ class StatusBasedProcessCommand(Command):
 
     def _execute_command(self) -> int:
         parsed_command = parse_python_command_string(self._command)
+        dispatcher = get_active_dispatcher()
+        if dispatcher is not None:
+            return dispatcher.run(parsed_command)
         print(f'Executing subprocess [{parsed_command}]')
-        process = subprocess.Popen(parsed_command)
+        # Outside of Windows a command string is treated as the path of the executable so the arguments must be split.
+        arguments = parsed_command if os.name == 'nt' else shlex.split(parsed_command)
+        process = subprocess.Popen(arguments, env=get_process_environment())
         process.communicate()
         status = process.wait()
         return status
@@ -1,2 +1,2 @@
 from .models import PluginNotFoundException, ProfileNotFoundException, ConfigNotFoundException,\
-    PropertyMissingException, PluginPropertyMissingException, PluginSectionMissingException
+    PropertyMissingException, PluginPropertyMissingException, PluginSectionMissingException, WorkerLostException
@@ -32,3 +32,9 @@ class PluginPropertyMissingException(Exception):
 
     def __init__(self, plugin: str, section: str, property: str):
         super().__init__(f'Could not find the property [{property}] within section [{section}] as required for the plugin [{plugin}].')
+
+
+class WorkerLostException(Exception):
+
+    def __init__(self, address: str, cause: str):
+        super().__init__(f'Lost connection to worker [{address}]: [{cause}]')
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+import os
+import sys
+import time
+
+from buildutils.runner import BuildConfiguration
+from buildutils.captured_build import run_captured_build
+from buildutils.commands import use_python_environment, executables_directory, MATRIX_CELL_VARIABLE
+from buildutils.exceptions import PropertyMissingException
+
+
+class MatrixCellResult:
+
+    """
+    The outcome of running the build against a single interpreter of the matrix.
+    """
+
+    def __init__(self, cell: str, interpreter: str, success: bool, duration: float, output: str):
+        self.cell = cell
+        self.interpreter = interpreter
+        self.success = success
+        self.duration = duration
+        self.output = output
+
+
+class MatrixBuild:
+
+    """Runs the same build concurrently against several local interpreters or virtual environments.
+
+    The matrix is read from the MATRIX section of the configuration file. The 'matrix' property lists the name of each
+    cell and every cell name is mapped to either the root directory of a virtual environment or the path to a python
+    executable. For example:
+
+    [MATRIX]
+    matrix = py310,py311
+    py310 = C:/venvs/py310
+    py311 = /usr/bin/python3.11
+
+    Each cell is built in a separate worker process in which the {PYTHON_VENV} and {PIP_VENV} placeholders resolve to
+    the cell's interpreter, the interpreter's directory is placed first on the PATH, and the COVERAGE_FILE and
+    temporary directory point to files and folders specific to the cell. Built-in plugins that write reports use
+    matrix_artifact_path so that the cells do not overwrite each other's artifacts.
+
+    The BuildConfiguration for each cell is created within the worker by calling the configure function so the
+    configure function must be a module level function.
+    """
+
+    _SECTION = 'MATRIX'
+    _ARTIFACTS_DIRECTORY = 'build-matrix'
+
+    def __init__(self, configure: Callable[[], BuildConfiguration]):
+        self._configure = configure
+        self._selected_cells: List[str] | None = None
+        self._max_workers: int | None = None
+
+    def cells(self, cells: str | None) -> MatrixBuild:
+        """
+        Restricts the build to a comma delimited subset of the cells listed in the matrix configuration.
+        """
+
+        self._selected_cells = [cell.strip() for cell in cells.split(',')] if cells is not None else None
+        return self
+
+    def workers(self, max_workers: int) -> MatrixBuild:
+        if max_workers < 1:
+            raise ValueError(f'The number of workers must be at least 1 but was: [{max_workers}]')
+        self._max_workers = max_workers
+        return self
+
+    def build(self, profile: str | None = None, plugins: str | None = None):
+        """
+        Builds every cell of the matrix using the provided profile or plugins. The profile and plugins arguments
+        behave the same as they do in BuildConfiguration.build.
+
+        Exits with a status of 1 if the build failed for any of the cells.
+        """
+
+        interpreters = self._read_matrix()
+        print(f'Running matrix build for cells: [{list(interpreters.keys())}]')
+
+        results: Dict[str, MatrixCellResult] = {}
+        with ProcessPoolExecutor(max_workers=self._max_workers or len(interpreters)) as executor:
+            futures: Dict[Future, str] = {
+                executor.submit(_build_cell, self._configure, cell, interpreter, profile, plugins): cell
+                for cell, interpreter in interpreters.items()
+            }
+            for future in as_completed(futures.keys()):
+                cell = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = MatrixCellResult(cell, interpreters[cell], False, 0, f'The worker building the cell failed: [{e}]')
+                results[cell] = result
+                print(f'\n=============== Matrix Cell: {cell} ({"passed" if result.success else "failed"}) ===============')
+                print(result.output)
+
+        self._print_results(interpreters, results)
+        if any(not result.success for result in results.values()):
+            sys.exit(1)
+
+    def _read_matrix(self) -> Dict[str, str]:
+        config = self._configure()._load_config_parser()
+        if MatrixBuild._SECTION not in config or 'matrix' not in config[MatrixBuild._SECTION]:
+            raise PropertyMissingException(MatrixBuild._SECTION, 'matrix')
+
+        section = config[MatrixBuild._SECTION]
+        cells = [cell.strip() for cell in section['matrix'].split(',')]
+        if self._selected_cells is not None:
+            unknown = [cell for cell in self._selected_cells if cell not in cells]
+            if len(unknown) > 0:
+                raise ValueError(f'The following cells are not part of the matrix: [{unknown}]')
+            cells = self._selected_cells
+
+        interpreters = {}
+        for cell in cells:
+            if cell not in section:
+                raise PropertyMissingException(MatrixBuild._SECTION, cell)
+            interpreters[cell] = os.path.abspath(os.path.expanduser(section[cell]))
+        return interpreters
+
+    def _print_results(self, interpreters: Dict[str, str], results: Dict[str, MatrixCellResult]):
+        print('\n--------------- Matrix Build Results ---------------')
+        width = max(len(cell) for cell in interpreters.keys())
+        for cell, interpreter in interpreters.items():
+            result = results[cell]
+            status = 'PASSED' if result.success else 'FAILED'
+            print(f'{cell.ljust(width)} | {status} | {result.duration:.1f}s | {interpreter}')
+        print('--------------- ---------------')
+
+
+def _cell_environment(cell: str, interpreter: str) -> Dict[str, str]:
+    artifacts = os.path.abspath(os.path.join(MatrixBuild._ARTIFACTS_DIRECTORY, cell))
+    temp_directory = os.path.join(artifacts, 'tmp')
+    os.makedirs(temp_directory, exist_ok=True)
+
+    environment = {
+        MATRIX_CELL_VARIABLE: cell,
+        'COVERAGE_FILE': os.path.abspath(f'.coverage.{cell}'),  # Matches matrix_artifact_path('.coverage') within the cell
+        'TMPDIR': temp_directory,
+        'TEMP': temp_directory,
+        'TMP': temp_directory,
+    }
+    if os.path.isdir(interpreter):
+        environment['VIRTUAL_ENV'] = interpreter
+        executables = str(executables_directory(interpreter))
+    else:
+        executables = os.path.dirname(interpreter)
+    environment['PATH'] = os.pathsep.join([executables, os.environ.get('PATH', '')])
+    return environment
+
+
+def _build_cell(configure: Callable[[], BuildConfiguration], cell: str, interpreter: str,
+                profile: str | None, plugins: str | None) -> MatrixCellResult:
+    environment = _cell_environment(cell, interpreter)
+    original_environment = {name: os.environ.get(name) for name in environment.keys()}
+    start = time.perf_counter()
+    os.environ.update(environment)
+    use_python_environment(interpreter)
+    try:
+        success, output = run_captured_build(lambda: configure().build(profile, plugins), cell)
+    finally:
+        # Worker processes are reused between cells so the environment of this cell must not leak into the next.
+        use_python_environment(None)
+        for name, value in original_environment.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return MatrixCellResult(cell, interpreter, success, time.perf_counter() - start, output)
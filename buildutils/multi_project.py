@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from configparser import ConfigParser
+import glob
+import itertools
+import os
+import sys
+import time
+
+from buildutils.runner import BuildConfiguration
+from buildutils.captured_build import run_captured_build
+from buildutils.exceptions import ConfigNotFoundException
+
+
+class ProjectResult:
+
+    """
+    The outcome of building a single sub-project as part of a multi-project build.
+    """
+
+    def __init__(self, project: str, success: bool, duration: float, output: str):
+        self.project = project
+        self.success = success
+        self.duration = duration
+        self.output = output
+
+
+class MultiProjectBuild:
+
+    """Builds many sub-projects, each with their own build configuration file, in parallel.
+
+    Each sub-project is built in a separate worker process with the working directory set to the directory containing
+    the sub-project's configuration file. The BuildConfiguration, and the plugins, for each sub-project are created
+    within the worker by calling the configure function. Because of this the configure function must be a module level
+    function so that it can be passed to the worker processes.
+
+    The output of each sub-project is captured and printed, one project at a time, as each project completes followed
+    by a final matrix of which projects passed and failed.
+    """
+
+    def __init__(self, configure: Callable[[], BuildConfiguration]):
+        """
+        Initializes the multi-project build.
+
+        Args:
+            configure (Callable[[], BuildConfiguration]): A module level function that returns a BuildConfiguration
+                with all the required plugins registered. The config file of the returned configuration will be
+                replaced with the discovered sub-project config file.
+        """
+
+        self._configure = configure
+        self._patterns: List[str] = []
+        self._shared_config_file: str | None = None
+        self._max_workers = os.cpu_count() or 1
+        self._fail_fast = False
+
+    def projects(self, *patterns: str) -> MultiProjectBuild:
+        """
+        Sets the glob patterns, such as packages/*/build.ini, used to discover the sub-project configuration files.
+        """
+
+        self._patterns = list(patterns)
+        return self
+
+    def shared_config(self, config_file: str) -> MultiProjectBuild:
+        """
+        Sets a configuration file, such as one containing the common lint settings, that is parsed once and provides
+        the default properties for every sub-project. The sections are merged key by key, so a sub-project's own
+        configuration file only overrides the properties it sets and inherits the rest of the shared section.
+        """
+
+        self._shared_config_file = config_file
+        return self
+
+    def workers(self, max_workers: int) -> MultiProjectBuild:
+        if max_workers < 1:
+            raise ValueError(f'The number of workers must be at least 1 but was: [{max_workers}]')
+        self._max_workers = max_workers
+        return self
+
+    def fail_fast(self, enabled: bool = True) -> MultiProjectBuild:
+        """
+        When enabled no further sub-project builds will be started after the first sub-project fails.
+        """
+
+        self._fail_fast = enabled
+        return self
+
+    def build(self, profile: str | None = None, plugins: str | None = None):
+        """
+        Discovers and builds each sub-project using the provided profile or plugins. The profile and plugins
+        arguments behave the same as they do in BuildConfiguration.build.
+
+        Exits with a status of 1 if any of the sub-project builds fail or were skipped due to fail fast.
+        """
+
+        config_files = self._discover_config_files()
+        if len(config_files) == 0:
+            print(f'No sub-project configuration files were found using the patterns: [{self._patterns}]')
+            sys.exit(1)
+        print(f'Building [{len(config_files)}] sub-projects using [{self._max_workers}] workers.')
+
+        shared_sections = self._read_shared_sections()
+        results: Dict[str, ProjectResult] = {}
+        remaining = iter(config_files)
+        stopped = False
+        # Projects running when a worker process dies are rebuilt one at a time once the other projects complete.
+        # A pool with a dead worker fails every project it was running, so only rebuilding them on their own tells
+        # the project that killed its worker apart from the projects that were running alongside it.
+        interrupted: List[str] = []
+        executor = ProcessPoolExecutor(max_workers=self._max_workers)
+
+        def submit(config_file: str) -> Future:
+            nonlocal executor
+            try:
+                return executor.submit(_build_project, self._configure, config_file, shared_sections, profile, plugins)
+            except BrokenProcessPool:
+                executor.shutdown(wait=False)
+                executor = ProcessPoolExecutor(max_workers=self._max_workers)
+                return executor.submit(_build_project, self._configure, config_file, shared_sections, profile, plugins)
+
+        try:
+            # Projects are submitted only as workers become free so that fail fast can stop queued projects from starting.
+            pending: Dict[Future, str] = {}
+            for config_file in itertools.islice(remaining, self._max_workers):
+                pending[submit(config_file)] = config_file
+            while len(pending) > 0:
+                done, _ = wait(pending.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    config_file = pending.pop(future)
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        print(f'A worker died while building [{_project_name(config_file)}]. The project will be rebuilt on its own.')
+                        interrupted.append(config_file)
+                    else:
+                        result = _result_from_future(future, _project_name(config_file))
+                        results[config_file] = result
+                        _print_project_output(result)
+                        if not result.success and self._fail_fast and not stopped:
+                            print(f'Project [{result.project}] failed. No further sub-project builds will be started.')
+                            stopped = True
+                    next_config_file = next(remaining, None) if not stopped else None
+                    if next_config_file is not None:
+                        pending[submit(next_config_file)] = next_config_file
+        finally:
+            executor.shutdown()
+
+        for config_file in interrupted:
+            if stopped:
+                break
+            with ProcessPoolExecutor(max_workers=1) as isolated_executor:
+                future = isolated_executor.submit(_build_project, self._configure, config_file, shared_sections, profile, plugins)
+                wait([future])
+            result = _result_from_future(future, _project_name(config_file))
+            results[config_file] = result
+            _print_project_output(result)
+            if not result.success and self._fail_fast:
+                print(f'Project [{result.project}] failed. No further sub-project builds will be started.')
+                stopped = True
+
+        self._print_matrix(config_files, results)
+        if len(results) < len(config_files) or any(not result.success for result in results.values()):
+            sys.exit(1)
+
+    def _discover_config_files(self) -> List[str]:
+        config_files = set()
+        for pattern in self._patterns:
+            config_files.update(os.path.normpath(path) for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        return sorted(config_files)
+
+    def _read_shared_sections(self) -> Dict[str, Dict[str, str]]:
+        if self._shared_config_file is None:
+            return {}
+        if not os.path.isfile(self._shared_config_file):
+            raise ConfigNotFoundException(self._shared_config_file)
+        config = ConfigParser()
+        config.read(self._shared_config_file)
+        return {section: dict(config[section]) for section in config.sections()}
+
+    def _print_matrix(self, config_files: List[str], results: Dict[str, ProjectResult]):
+        print('\n--------------- Multi-Project Build Results ---------------')
+        width = max(len(_project_name(config_file)) for config_file in config_files)
+        for config_file in config_files:
+            name = _project_name(config_file)
+            result = results.get(config_file)
+            if result is None:
+                print(f'{name.ljust(width)} | SKIPPED |')
+                continue
+            status = 'PASSED ' if result.success else 'FAILED '
+            print(f'{name.ljust(width)} | {status} | {result.duration:.1f}s')
+        print('--------------- ---------------')
+
+
+def _project_name(config_file: str) -> str:
+    directory = os.path.dirname(config_file)
+    return directory if directory != '' else '.'
+
+
+def _result_from_future(future: Future, project: str) -> ProjectResult:
+    try:
+        return future.result()
+    except Exception as e:
+        # A worker process that dies abruptly while building the project on its own should be reported as a failed
+        # project rather than stop the build.
+        return ProjectResult(project, False, 0, f'The worker building the project failed: [{e}]')
+
+
+def _print_project_output(result: ProjectResult):
+    status = 'passed' if result.success else 'failed'
+    print(f'\n=============== Project: {result.project} ({status}) ===============')
+    print(result.output)
+
+
+def _build_project(configure: Callable[[], BuildConfiguration], config_file: str, shared_sections: Dict[str, Dict[str, str]],
+                   profile: str | None, plugins: str | None) -> ProjectResult:
+    def build():
+        configure().config(os.path.basename(config_file)).config_defaults(shared_sections).build(profile, plugins)
+
+    project = _project_name(config_file)
+    original_directory = os.getcwd()
+    start = time.perf_counter()
+    try:
+        os.chdir(os.path.dirname(config_file) or '.')
+        success, output = run_captured_build(build, project)
+    finally:
+        os.chdir(original_directory)
+    return ProjectResult(project, success, time.perf_counter() - start, output)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+import heapq
+
+
+class PlannedStep:
+
+    """
+    A single plugin within a build plan along with its expected duration and the plugins it depends on.
+    """
+
+    def __init__(self, name: str, duration: float | None, dependencies: List[str]):
+        """
+        Initializes the planned step.
+
+        Args:
+            name (str): The name of the plugin.
+            duration (float): The expected duration of the plugin in seconds or None if it has no recorded timings.
+            dependencies (List[str]): The names of the plugins, earlier in the plan, that must complete first.
+        """
+
+        self.name = name
+        self.duration = duration
+        self.dependencies = dependencies
+        self.earliest_start = 0.0
+        self.earliest_finish = 0.0
+
+
+class BuildPlan:
+
+    """Estimates the wall time of a build from the recorded plugin timings.
+
+    The steps must be ordered so every step appears after the steps it depends on. Steps without recorded timings
+    are assumed to take no time so the estimates are a lower bound whenever any step is missing timings.
+    """
+
+    _IMPACT_FACTOR = 0.5
+    _MAX_IMPACT_ENTRIES = 5
+
+    def __init__(self, steps: List[PlannedStep], jobs: int):
+        """
+        Initializes the build plan.
+
+        Args:
+            steps (List[PlannedStep]): The steps in the order the build executes them.
+            jobs (int): The number of plugins that could be executed at the same time.
+        """
+
+        if jobs < 1:
+            raise ValueError(f'The number of jobs must be at least 1 but was [{jobs}].')
+        self._steps = steps
+        self._jobs = jobs
+        self._indexes = {step.name: index for (index, step) in enumerate(steps)}
+        self._dependencies = [[self._indexes[name] for name in step.dependencies] for step in steps]
+        self._compute_earliest_times()
+
+    def sequential_time(self) -> float:
+        return sum(self._durations())
+
+    def critical_path(self) -> List[PlannedStep]:
+        """
+        Gets the chain of dependent steps with the longest total duration. No matter how many jobs are available the
+        build cannot complete faster than the duration of this path.
+        """
+
+        if len(self._steps) == 0:
+            return []
+        step = max(self._steps, key=lambda candidate: candidate.earliest_finish)
+        path = [step]
+        while len(step.dependencies) > 0:
+            step = max((self._steps[self._indexes[name]] for name in step.dependencies), key=lambda candidate: candidate.earliest_finish)
+            path.append(step)
+        return list(reversed(path))
+
+    def minimum_wall_time(self) -> float:
+        """
+        Gets the theoretical minimum wall time with the configured number of jobs. The build can be no faster than
+        its critical path or than its total duration evenly divided between the jobs.
+        """
+
+        critical_path_time = max((step.earliest_finish for step in self._steps), default=0.0)
+        return max(critical_path_time, self.sequential_time() / self._jobs)
+
+    def estimated_wall_time(self, durations: List[float] | None = None) -> float:
+        """
+        Estimates the wall time by simulating the build with the configured number of jobs. Whenever a job is free
+        the ready step with the longest remaining path to the end of the build is started.
+
+        Args:
+            durations (List[float]): Optional durations, in the order of the steps, to use instead of the expected
+                durations of the steps.
+        """
+
+        durations = durations if durations is not None else self._durations()
+        priorities = self._remaining_path_times(durations)
+        remaining_dependencies = [len(dependencies) for dependencies in self._dependencies]
+        dependents: List[List[int]] = [[] for _ in self._steps]
+        for (index, dependencies) in enumerate(self._dependencies):
+            for dependency in dependencies:
+                dependents[dependency].append(index)
+
+        ready = [(-priorities[index], index) for index in range(len(self._steps)) if remaining_dependencies[index] == 0]
+        heapq.heapify(ready)
+        running: List[Tuple[float, int]] = []
+        time = 0.0
+        while len(ready) > 0 or len(running) > 0:
+            while len(ready) > 0 and len(running) < self._jobs:
+                (_, index) = heapq.heappop(ready)
+                heapq.heappush(running, (time + durations[index], index))
+            (time, index) = heapq.heappop(running)
+            for dependent in dependents[index]:
+                remaining_dependencies[dependent] -= 1
+                if remaining_dependencies[dependent] == 0:
+                    heapq.heappush(ready, (-priorities[dependent], dependent))
+        return time
+
+    def largest_impacts(self) -> List[Tuple[PlannedStep, float]]:
+        """
+        Gets the steps that would most reduce the estimated wall time if they were made twice as fast, or split into
+        two halves that could run at the same time.
+
+        Returns:
+            The steps and the number of seconds that would be saved ordered from the largest saving.
+        """
+
+        baseline = self.estimated_wall_time()
+        impacts = []
+        for (index, step) in enumerate(self._steps):
+            durations = self._durations()
+            durations[index] *= BuildPlan._IMPACT_FACTOR
+            saving = baseline - self.estimated_wall_time(durations)
+            if saving > 0:
+                impacts.append((step, saving))
+        impacts.sort(key=lambda impact: impact[1], reverse=True)
+        return impacts[:BuildPlan._MAX_IMPACT_ENTRIES]
+
+    def print_report(self):
+        print(f'Build plan for [{len(self._steps)}] plugins with [{self._jobs}] job(s):')
+        name_width = max([len(step.name) for step in self._steps] + [len('plugin')])
+        print(f'{"plugin".ljust(name_width)} {"expected".rjust(10)} {"start".rjust(10)} {"finish".rjust(10)}  depends on')
+        for step in self._steps:
+            expected = f'{step.duration:.2f}s' if step.duration is not None else '?'
+            dependencies = ', '.join(step.dependencies) if len(step.dependencies) > 0 else '-'
+            print(f'{step.name.ljust(name_width)} {expected.rjust(10)} {step.earliest_start:>9.2f}s {step.earliest_finish:>9.2f}s  {dependencies}')
+
+        critical_path = self.critical_path()
+        print(f'\nSequential wall time: [{self.sequential_time():.2f}]s')
+        print(f'Critical path: [{" -> ".join(step.name for step in critical_path)}] '
+              f'taking [{sum(step.duration or 0.0 for step in critical_path):.2f}]s')
+        print(f'Theoretical minimum wall time with [{self._jobs}] job(s): [{self.minimum_wall_time():.2f}]s')
+        print(f'Estimated wall time with [{self._jobs}] job(s): [{self.estimated_wall_time():.2f}]s')
+
+        impacts = self.largest_impacts()
+        if len(impacts) > 0:
+            print('\nPlugins that would most reduce the build time if made twice as fast or split in two:')
+            for (step, saving) in impacts:
+                print(f'\t[{step.name}] would save [{saving:.2f}]s')
+
+        missing = [step.name for step in self._steps if step.duration is None]
+        if len(missing) > 0:
+            print(f'\nThe plugins [{missing}] have no recorded timings and were assumed to take no time.')
+
+    def _durations(self) -> List[float]:
+        return [step.duration or 0.0 for step in self._steps]
+
+    def _compute_earliest_times(self):
+        for (index, step) in enumerate(self._steps):
+            step.earliest_start = max((self._steps[dependency].earliest_finish for dependency in self._dependencies[index]), default=0.0)
+            step.earliest_finish = step.earliest_start + (step.duration or 0.0)
+
+    def _remaining_path_times(self, durations: List[float]) -> List[float]:
+        remaining = list(durations)
+        for index in reversed(range(len(self._steps))):
+            for dependency in self._dependencies[index]:
+                remaining[dependency] = max(remaining[dependency], durations[dependency] + remaining[index])
+        return remaining
+
+
+def read_dependencies(section: Dict[str, str] | None, previous_step: str | None) -> List[str]:
+    """
+    Reads the comma delimited 'depends_on' property from a plugin's config section.
+
+    Returns:
+        The names of the plugins the plugin depends on. When the property is not present the plugin is assumed to
+        depend on the previous step, matching the order the plugins are executed in.
+    """
+
+    if section is None or 'depends_on' not in section:
+        return [previous_step] if previous_step is not None else []
+    return [name.strip() for name in section['depends_on'].split(',') if name.strip() != '']
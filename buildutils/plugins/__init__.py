@@ -1,8 +1,12 @@
 from .base import *
 from .coverage import CoveragePlugin
 from .flake import FlakePlugin
+from .typecheck import TypeCheckPlugin
 from .generic import GenericCommandPlugin, GenericCleanPlugin
 from .ensure_env import EnsureVenvActivePlugin
+from .dependency_install import DependencyInstallPlugin
+from .bytecode import BytecodeWarmupPlugin
+from .package import PackagePlugin
 from .alias import PluginGroup, alias
 from .group import PluginGroup, group
 from .config import PluginConfigHelper
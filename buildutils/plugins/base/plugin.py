@@ -30,6 +30,7 @@ class Plugin(ABC):
         """
         self.name = name.lower().replace(' ', '_')
         self.source_name = name
+        self.section_name = name
         self.help_text = help_text
         self._commands: List[Command] = []
         self._cleanup_command: Command | None = None
@@ -43,6 +44,15 @@ class Plugin(ABC):
     def _use_command_for_cleanup(self, command: Command):
         self._cleanup_command = command
 
+    def reset_commands(self):
+        """
+        Removes the commands registered by a previous call to load_config so that loading the configuration again,
+        for another build of the same configuration, does not register every command twice.
+        """
+
+        self._commands = []
+        self._cleanup_command = None
+
     @abstractmethod
     def load_config(self, config: ConfigParser):
         """
@@ -8,17 +8,19 @@ from buildutils.commands import as_command
 
 class SingleFunctionPlugin(Plugin):
 
-    def __init__(self, name: str, help_text: str, function: Callable[[], bool]):
+    def __init__(self, name: str, help_text: str, function: Callable[[], bool], isolated: bool = False):
         super().__init__(name, help_text)
-        self._command = as_command(f'{name}-command', function)
+        self._command = as_command(f'{name}-command', function, isolated)
 
     def load_config(self, config: ConfigParser):
         self._use_command(self._command)
 
 
-def as_plugin(name: str, help_text: str, function: Callable[[], bool]) -> Plugin:
+def as_plugin(name: str, help_text: str, function: Callable[[], bool], isolated: bool = False) -> Plugin:
     """
     Wraps a single function in the context of a plugin so it can be executed as part of the build process.
+
+    When isolated is True the function will be executed in a worker process. See as_command for more details.
     """
 
-    return SingleFunctionPlugin(name, help_text, function)
+    return SingleFunctionPlugin(name, help_text, function, isolated)
@@ -0,0 +1,133 @@
+from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from configparser import ConfigParser
+import compileall
+import functools
+import importlib.util
+import os
+import py_compile
+import sys
+import sysconfig
+
+from buildutils.commands import Command, export_environment_variable
+
+from .base import Plugin
+from .config import PluginConfigHelper
+
+
+class BytecodeWarmupPlugin(Plugin):
+
+    """Plugin used to byte-compile the project, and optionally its dependencies, into a shared pycache prefix
+    directory so the interpreters started by later plugins do not need to compile the same sources again.
+
+    This plugin looks for configuration values under the BYTECODE_WARMUP section of the configuration file. From that
+    section it pulls the values for 'paths', 'include_dependencies', 'cache_prefix', and 'workers'.
+
+    paths: A comma delimited list of the directories to compile. Defaults to the current directory.
+
+    include_dependencies: If true the site-packages directories of the interpreter running the build will be compiled
+    as well. Defaults to false.
+
+    cache_prefix: The directory the compiled bytecode will be written to. Defaults to .pycache.
+
+    workers: The number of worker processes to compile with. Defaults to 0 which uses one worker per CPU.
+
+    Once the configuration has been loaded the cache prefix is exported, through the PYTHONPYCACHEPREFIX environment
+    variable, to every subprocess started by the remaining plugins of the build. The bytecode is compiled using
+    hash based invalidation, so bytecode compiled on one branch is never used for a source file that has since changed.
+    Files whose existing bytecode holds the hash of their current contents are not compiled again.
+    """
+
+    def __init__(self):
+        super().__init__('bytecode-warmup', 'Byte-compile the project and its dependencies into a shared pycache prefix.')
+        self.section_name = 'BYTECODE_WARMUP'
+
+    def load_config(self, config: ConfigParser):
+        helper = PluginConfigHelper(self, config)
+        paths = [path.strip() for path in helper.list_prop('paths', default_value='.')]
+        if helper.bool_prop('include_dependencies', 'False'):
+            paths.extend(sorted({sysconfig.get_paths()['purelib'], sysconfig.get_paths()['platlib']}))
+        cache_prefix = os.path.abspath(helper.prop('cache_prefix', '.pycache'))
+        workers = helper.int_prop('workers', '0')
+
+        # Exported during config loading so the prefix still applies when this plugin is skipped by a resumed build.
+        export_environment_variable('PYTHONPYCACHEPREFIX', cache_prefix)
+        self._use_command(_BytecodeCompileCommand(paths, cache_prefix, workers))
+
+
+_CHUNK_SIZE = 64
+
+
+class _BytecodeCompileCommand(Command):
+
+    _PREFIX_VARIABLE = 'PYTHONPYCACHEPREFIX'
+
+    def __init__(self, paths: List[str], cache_prefix: str, workers: int):
+        super().__init__('bytecode-compile')
+        self._paths = paths
+        self._cache_prefix = cache_prefix
+        self._workers = workers
+
+    def execute(self) -> bool:
+        # The compiled file locations are derived from sys.pycache_prefix in this process and from the environment
+        # variable in worker processes that are spawned rather than forked.
+        original_prefix = sys.pycache_prefix
+        original_variable = os.environ.get(_BytecodeCompileCommand._PREFIX_VARIABLE)
+        sys.pycache_prefix = self._cache_prefix
+        os.environ[_BytecodeCompileCommand._PREFIX_VARIABLE] = self._cache_prefix
+        try:
+            stale_files = []
+            for path in self._paths:
+                if not os.path.isdir(path):
+                    print(f'Skipping [{path}] as it is not a directory')
+                    continue
+                source_files = _source_files(path)
+                path_stale_files = [source_file for source_file in source_files if not _is_up_to_date(source_file)]
+                print(f'Compiling [{len(path_stale_files)}] of [{len(source_files)}] files in [{path}] into [{self._cache_prefix}]')
+                stale_files.extend(path_stale_files)
+            success = self._compile(stale_files)
+        finally:
+            sys.pycache_prefix = original_prefix
+            if original_variable is None:
+                os.environ.pop(_BytecodeCompileCommand._PREFIX_VARIABLE, None)
+            else:
+                os.environ[_BytecodeCompileCommand._PREFIX_VARIABLE] = original_variable
+        if not success:
+            print('One or more files could not be compiled. See the output above for the details.')
+        return success
+
+    def _compile(self, source_files: List[str]) -> bool:
+        compile_file = functools.partial(compileall.compile_file, quiet=1, invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+        if self._workers == 1 or len(source_files) <= 1:
+            results = [compile_file(source_file) for source_file in source_files]
+        else:
+            with ProcessPoolExecutor(max_workers=self._workers or None) as executor:
+                results = list(executor.map(compile_file, source_files, chunksize=_CHUNK_SIZE))
+        return all(results)
+
+
+def _source_files(directory: str) -> List[str]:
+    source_files = []
+    for (root, directories, file_names) in os.walk(directory):
+        directories[:] = sorted(name for name in directories if name != '__pycache__')
+        source_files.extend(os.path.join(root, name) for name in sorted(file_names) if name.endswith('.py'))
+    return source_files
+
+
+def _is_up_to_date(source_file: str) -> bool:
+    """
+    Checks if the bytecode of the source file was compiled with hash based invalidation from the current contents of
+    the source file. The header of such a file holds the magic number, the flags with bit 0 set, and the source hash.
+    """
+
+    try:
+        with open(importlib.util.cache_from_source(source_file), 'rb') as file:
+            header = file.read(16)
+        with open(source_file, 'rb') as file:
+            source = file.read()
+    except (OSError, ValueError):
+        return False
+    if len(header) < 16 or header[:4] != importlib.util.MAGIC_NUMBER:
+        return False
+    flags = int.from_bytes(header[4:8], 'little')
+    return flags & 0b1 == 1 and header[8:16] == importlib.util.source_hash(source)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from configparser import ConfigParser
 
@@ -15,7 +15,7 @@ class PluginConfigHelper:
     """
 
     def __init__(self, plugin: Plugin, config: ConfigParser, section_name: str = None):
-        self._section_name = section_name if section_name is not None else plugin.source_name
+        self._section_name = section_name if section_name is not None else plugin.section_name
         if self._section_name not in config:
             raise PluginSectionMissingException(plugin.name, self._section_name)
 
@@ -50,3 +50,15 @@ class PluginConfigHelper:
 
     def int_prop(self, name: str, default_value: str | None = None) -> int:
         return int(self.prop(name, default_value))
+
+    def prefixed_props(self, prefix: str) -> Dict[str, str]:
+        """
+        Gets all the properties within the config section whose names start with the prefix. The returned dictionary
+        is keyed by the remainder of each property name after the prefix.
+
+        Args:
+            prefix (str): The case-insensitive prefix of the property names to load.
+        """
+
+        prefix = prefix.lower()
+        return {name[len(prefix):]: value for name, value in self._section.items() if name.lower().startswith(prefix)}
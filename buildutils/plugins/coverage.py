@@ -1,3 +1,4 @@
+import os
 from configparser import ConfigParser
 
 from bs4 import BeautifulSoup
@@ -6,7 +7,8 @@ from buildutils.commands import (
     StatusBasedProcessCommand,
     ReportOpenCommand,
     ReportCheckCommand,
-    FileCleanupCommand
+    FileCleanupCommand,
+    matrix_artifact_path
 )
 
 from .base import Plugin
@@ -33,44 +35,49 @@ class CoveragePlugin(Plugin):
     completed assuming that the coverage requirement has either been met or skipped.
     """
 
+    REPORT_DIRECTORY = './htmlcov'
     REPORT_PATH = './htmlcov/index.html'
 
     def __init__(self):
         super().__init__('coverage-test', 'Run unit tests and measure code coverage using the Python Coverage package.')
+        self.section_name = 'COVERAGE'
 
     def load_config(self, config: ConfigParser):
-        helper = PluginConfigHelper(self, config, 'COVERAGE')
+        helper = PluginConfigHelper(self, config)
 
         command = helper.prop('command')
         self._use_command(StatusBasedProcessCommand('coverage', [0], command))  # Run the coverage package
-        self._use_command(_CoverageReportCommand())  # Generate the coverage HTML report
+        report_directory = matrix_artifact_path(CoveragePlugin.REPORT_DIRECTORY)
+        report_path = os.path.join(report_directory, 'index.html')
+        self._use_command(_CoverageReportCommand(report_directory, report_path))  # Generate the coverage HTML report
 
         if helper.bool_prop('enable_coverage_check', 'False'):
             coverage_requirement = helper.int_prop('coverage_requirement')
-            self._use_command(_CoverageCheckCommand(coverage_requirement))  # Check if code coverage thresholds are met
+            self._use_command(_CoverageCheckCommand(report_path, coverage_requirement))  # Check if code coverage thresholds are met
 
         if helper.bool_prop('open_coverage_report', 'False'):
-            self._use_command(ReportOpenCommand('open-coverage-report', CoveragePlugin.REPORT_PATH))  # Open coverate HTML report
+            self._use_command(ReportOpenCommand('open-coverage-report', report_path))  # Open coverate HTML report
 
-        self._use_command_for_cleanup(FileCleanupCommand('coverage-cleanup', ['.coverage']))
+        self._use_command_for_cleanup(FileCleanupCommand('coverage-cleanup', [matrix_artifact_path('.coverage')]))
 
 
 class _CoverageReportCommand(StatusBasedProcessCommand):
 
-    def __init__(self):
-        super().__init__('coverage-report', [0], 'coverage html')
+    def __init__(self, report_directory: str, report_path: str):
+        super().__init__('coverage-report', [0], f'coverage html -d {report_directory}')
+        self._report_path = report_path
 
     def execute(self):
         if not super().execute():
             return False
-        print(f'Coverage report has been generated. It can be found at [{CoveragePlugin.REPORT_PATH}].')
+        print(f'Coverage report has been generated. It can be found at [{self._report_path}].')
         return True
 
 
 class _CoverageCheckCommand(ReportCheckCommand):
 
-    def __init__(self, coverage_requirement: int):
-        super().__init__('coverage-check', CoveragePlugin.REPORT_PATH)
+    def __init__(self, report_path: str, coverage_requirement: int):
+        super().__init__('coverage-check', report_path)
         self._coverage_requirement = coverage_requirement
 
     def _check_report(self, html: BeautifulSoup) -> bool:
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Callable, Dict
+from configparser import ConfigParser
+
+from buildutils.exceptions import PropertyMissingException
+
+from .base import Plugin
+from .generic import GenericCommandPlugin, GenericCleanPlugin
+
+
+PluginFactory = Callable[[str, str], Plugin]
+
+DEFAULT_PLUGIN_TYPES: Dict[str, PluginFactory] = {
+    'generic-command': GenericCommandPlugin,
+    'generic-clean': GenericCleanPlugin,
+}
+
+
+class PluginDeclaration:
+
+    """A plugin declared within the configuration file rather than registered through BuildConfiguration.plugins.
+
+    A plugin is declared using a section named PLUGIN:<name> containing a 'type' property, an optional 'help'
+    property, and any properties required by the type of plugin. For example:
+
+    [PLUGIN:install]
+    type = generic-command
+    help = Install the project dependencies.
+    command = pip install -r requirements.txt
+    expected_status = 0
+
+    A section whose name contains a * is a template that declares one plugin for each value of its 'for_each'
+    property. The * in the name, and any {item} placeholder within the template's properties, is replaced with the
+    value. For example, the following declares the plugins lint-api and lint-worker:
+
+    [PLUGIN:lint-*]
+    type = generic-command
+    for_each = api,worker
+    command = flake8 packages/{item}
+    expected_status = 0
+
+    The declared plugins are only created when they are selected for execution.
+    """
+
+    SECTION_PREFIX = 'PLUGIN:'
+
+    _TYPE_PROPERTY = 'type'
+    _HELP_PROPERTY = 'help'
+    _FOR_EACH_PROPERTY = 'for_each'
+    _ITEM_PLACEHOLDER = '{item}'
+    _TEMPLATE_WILDCARD = '*'
+
+    def __init__(self, name: str, section_name: str, item: str | None = None):
+        self.name = name
+        self._section_name = section_name
+        self._item = item
+
+    def create(self, config: ConfigParser, plugin_types: Dict[str, PluginFactory]) -> Plugin:
+        """
+        Creates the declared plugin. For plugins declared by a template a section, with the template's properties and
+        the {item} placeholders substituted, is added to the config for the plugin to load its values from.
+        """
+
+        section = config[self._section_name]
+        if PluginDeclaration._TYPE_PROPERTY not in section:
+            raise PropertyMissingException(self._section_name, PluginDeclaration._TYPE_PROPERTY)
+        plugin_type = section[PluginDeclaration._TYPE_PROPERTY].strip().lower()
+        if plugin_type not in plugin_types:
+            raise ValueError(f'The plugin [{self.name}] declared an unknown type of: [{plugin_type}]. Expected one of [{list(plugin_types.keys())}].')
+
+        section_name = self._section_name
+        if self._item is not None:
+            section_name = f'{PluginDeclaration.SECTION_PREFIX}{self.name}'
+            config[section_name] = {
+                key: value.replace(PluginDeclaration._ITEM_PLACEHOLDER, self._item)
+                for key, value in config.items(self._section_name, raw=True)
+            }
+
+        help_text = config[section_name].get(PluginDeclaration._HELP_PROPERTY, f'Declared {plugin_type} plugin.')
+        plugin = plugin_types[plugin_type](self.name, help_text)
+        plugin.section_name = section_name
+        return plugin
+
+
+def read_plugin_declarations(config: ConfigParser) -> Dict[str, PluginDeclaration]:
+    """
+    Reads the plugin declarations from the PLUGIN: sections of the config, expanding any templates.
+
+    Returns:
+        The declarations keyed by the normalized name of the declared plugin.
+    """
+
+    declarations: Dict[str, PluginDeclaration] = {}
+    for section_name in config.sections():
+        if not section_name.upper().startswith(PluginDeclaration.SECTION_PREFIX):
+            continue
+        name = section_name[len(PluginDeclaration.SECTION_PREFIX):].strip()
+        if PluginDeclaration._TEMPLATE_WILDCARD not in name:
+            _add_declaration(declarations, PluginDeclaration(name, section_name))
+            continue
+
+        section = config[section_name]
+        if PluginDeclaration._FOR_EACH_PROPERTY not in section:
+            raise PropertyMissingException(section_name, PluginDeclaration._FOR_EACH_PROPERTY)
+        for item in section[PluginDeclaration._FOR_EACH_PROPERTY].split(','):
+            item = item.strip()
+            if item != '':
+                _add_declaration(declarations, PluginDeclaration(name.replace(PluginDeclaration._TEMPLATE_WILDCARD, item), section_name, item))
+    return declarations
+
+
+def normalize_plugin_name(name: str) -> str:
+    return name.strip().lower().replace(' ', '_')
+
+
+def _add_declaration(declarations: Dict[str, PluginDeclaration], declaration: PluginDeclaration):
+    key = normalize_plugin_name(declaration.name)
+    if key in declarations:
+        raise ValueError(f'Two or more plugins were declared under the same name of: [{declaration.name}]')
+    declarations[key] = declaration
@@ -0,0 +1,226 @@
+from typing import Dict, List
+from configparser import ConfigParser
+import json
+import os
+import shutil
+import subprocess
+
+from buildutils.commands import Command, StatusBasedProcessCommand, fingerprint, parse_python_command_string, get_process_environment
+
+from .base import Plugin
+from .config import PluginConfigHelper
+
+
+_DESCRIBE_ENVIRONMENT_SCRIPT = (
+    'import json, sys, sysconfig; '
+    'print(json.dumps({"prefix": sys.prefix, "base_prefix": sys.base_prefix, "version": sys.version, '
+    '"platform": sys.platform, "paths": sysconfig.get_paths()}))'
+)
+
+
+class DependencyInstallPlugin(Plugin):
+
+    """Plugin used to install the project dependencies only when the requirements have changed.
+
+    This plugin looks for configuration values under the INSTALL_DEPENDENCIES section of the configuration file. From
+    that section it pulls the values for 'command', 'files', 'expected_status', and 'snapshot_cache'.
+
+    command: Specifies the command used to install the dependencies. For example:
+    {PIP_VENV} install -r requirements.txt
+
+    files: A comma delimited list of the requirements and lock files the installed dependencies are derived from. The
+    contents of these files, the install command, and the interpreter version are hashed and the hash is stored in
+    the virtual environment after a successful install. The install is skipped when the stored hash matches. The path
+    of the virtual environment is part of the hash as well. The virtual environment is the one the {PYTHON_VENV}
+    placeholder resolves to, so within a matrix build each cell tracks the dependencies of its own environment.
+
+    expected_status: A comma delimited list of exit statuses of the install command that indicate success.
+    Defaults to 0.
+
+    snapshot_cache: An optional directory in which a snapshot of site-packages, and of the scripts directory holding
+    the package entry points, will be kept for each hash. When the hash does not match but a snapshot for the hash
+    exists these directories will be populated from the snapshot using hardlinks instead of executing the install
+    command. Since the entry points and activation scripts embed the path of the virtual environment each snapshot is
+    only restored into the environment it was taken from, so a cache shared between checkouts holds a snapshot per
+    environment. Packages should not be modified in place within the virtual environment when this is enabled since
+    the files are shared with the snapshot.
+    """
+
+    def __init__(self):
+        super().__init__('install-dependencies', 'Install dependencies when the requirements or interpreter have changed.')
+        self.section_name = 'INSTALL_DEPENDENCIES'
+
+    def load_config(self, config: ConfigParser):
+        helper = PluginConfigHelper(self, config)
+        command = helper.prop('command')
+        files = [file.strip() for file in helper.list_prop('files')]
+        statuses = helper.int_list_prop('expected_status', default_value='0')
+        snapshot_cache = helper.prop('snapshot_cache', '')
+        self._use_command(_DependencyInstallCommand(command, files, statuses, snapshot_cache if snapshot_cache != '' else None))
+
+
+class _DependencyInstallCommand(Command):
+
+    _HASH_FILE_NAME = 'buildutils-dependencies.sha256'
+
+    def __init__(self, command: str, files: List[str], statuses: List[int], snapshot_cache: str | None):
+        super().__init__('install-dependencies-command')
+        self._install_command = StatusBasedProcessCommand('install-dependencies-process', statuses, command)
+        self._files = files
+        self._command = command
+        self._snapshot_cache = snapshot_cache
+
+    def execute(self) -> bool:
+        environment = _target_environment()
+        if environment is None or environment['prefix'] == environment['base_prefix']:
+            print('Build is not being executed in a virtual environment. Dependencies will always be installed.')
+            return self._install_command.execute()
+
+        # The environment path is part of the hash since the entry points and activation scripts embed it, so a
+        # snapshot can only be restored into the environment it was taken from.
+        prefix = environment['prefix']
+        current_hash = fingerprint(self._files, [self._command, environment['version'], environment['platform'], os.path.realpath(prefix)])
+        hash_file = os.path.join(prefix, _DependencyInstallCommand._HASH_FILE_NAME)
+        if _read_hash(hash_file) == current_hash:
+            print(f'Dependencies are up to date with [{self._files}]. Skipping install.')
+            return True
+        # Removed before the environment is modified so an interrupted install or restore is never considered current.
+        if os.path.isfile(hash_file):
+            os.remove(hash_file)
+
+        directories = _environment_directories(environment['paths'])
+        snapshot = os.path.join(self._snapshot_cache, current_hash) if self._snapshot_cache is not None else None
+        if snapshot is not None and _is_complete_snapshot(snapshot, directories):
+            print(f'Restoring dependencies from snapshot [{snapshot}]')
+            for (name, directory) in directories.items():
+                _link_tree(os.path.join(snapshot, name), directory, remove_extra=True)
+        else:
+            if not self._install_command.execute():
+                return False
+            if snapshot is not None:
+                print(f'Saving dependency snapshot to [{snapshot}]')
+                _save_snapshot(directories, snapshot)
+
+        with open(hash_file, 'w') as file:
+            file.write(current_hash)
+        return True
+
+
+def _target_environment() -> Dict | None:
+    """
+    Describes the environment the {PYTHON_VENV} placeholder resolves to, which is the environment of a matrix cell
+    when running a matrix build, rather than the environment of the interpreter executing the build.
+
+    Returns:
+        The prefix, base prefix, version, platform, and sysconfig paths of the target interpreter or None if the
+        placeholder cannot be resolved or the interpreter cannot be queried.
+    """
+
+    interpreter = parse_python_command_string('{PYTHON_VENV}')
+    if interpreter == '{PYTHON_VENV}':
+        return None
+    try:
+        process = subprocess.run([interpreter, '-c', _DESCRIBE_ENVIRONMENT_SCRIPT], stdout=subprocess.PIPE, universal_newlines=True,
+                                 env=get_process_environment())
+        if process.returncode != 0:
+            return None
+        return json.loads(process.stdout)
+    except (OSError, ValueError) as e:
+        print(f'Could not query the interpreter [{interpreter}]: [{e}]')
+        return None
+
+
+def _environment_directories(paths: Dict[str, str]) -> Dict[str, str]:
+    """
+    Gets the directories of the virtual environment an install can modify keyed by the name of the directory within
+    a snapshot. The platlib directory is only included when it is not the same directory as purelib.
+    """
+
+    directories = {'purelib': paths['purelib'], 'scripts': paths['scripts']}
+    if os.path.realpath(paths['platlib']) != os.path.realpath(paths['purelib']):
+        directories['platlib'] = paths['platlib']
+    return directories
+
+
+def _is_complete_snapshot(snapshot: str, directories: Dict[str, str]) -> bool:
+    return all(os.path.isdir(os.path.join(snapshot, name)) for name in directories.keys())
+
+
+def _read_hash(hash_file: str) -> str | None:
+    if not os.path.isfile(hash_file):
+        return None
+    with open(hash_file, 'r') as file:
+        return file.read().strip()
+
+
+def _link_or_copy(source: str, destination: str):
+    if os.path.lexists(destination):
+        if os.path.exists(destination) and os.path.samefile(source, destination):
+            # Already linked to the snapshot. This also avoids replacing the running interpreter within the scripts.
+            return
+        _remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        # Hardlinks are not possible across devices or on some file systems so fall back to a regular copy.
+        shutil.copy2(source, destination)
+
+
+def _copy_symlink(source: str, destination: str):
+    target = os.readlink(source)
+    if os.path.islink(destination) and os.readlink(destination) == target:
+        return
+    if os.path.lexists(destination):
+        _remove(destination)
+    os.symlink(target, destination)
+
+
+def _remove(path: str):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+def _remove_extra_entries(source: str, destination: str):
+    for entry in os.scandir(destination):
+        source_path = os.path.join(source, entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            if os.path.isdir(source_path) and not os.path.islink(source_path):
+                _remove_extra_entries(source_path, entry.path)
+            else:
+                shutil.rmtree(entry.path)
+        elif not os.path.lexists(source_path) or os.path.isdir(source_path):
+            os.remove(entry.path)
+
+
+def _link_tree(source: str, destination: str, remove_extra: bool = False):
+    if remove_extra and os.path.isdir(destination):
+        _remove_extra_entries(source, destination)
+    # Copied by hand rather than with shutil.copytree since copytree fails on symbolic links that already exist, such
+    # as the python links within the scripts directory of every virtual environment.
+    if os.path.lexists(destination) and (os.path.islink(destination) or not os.path.isdir(destination)):
+        os.remove(destination)
+    os.makedirs(destination, exist_ok=True)
+    for entry in os.scandir(source):
+        destination_path = os.path.join(destination, entry.name)
+        if entry.is_symlink():
+            _copy_symlink(entry.path, destination_path)
+        elif entry.is_dir():
+            _link_tree(entry.path, destination_path)
+        else:
+            _link_or_copy(entry.path, destination_path)
+    shutil.copystat(source, destination)
+
+
+def _save_snapshot(directories: Dict[str, str], snapshot: str):
+    # Populate a temporary directory first so an interrupted build never leaves a partial snapshot behind.
+    staging = f'{snapshot}.partial'
+    if os.path.isdir(staging):
+        shutil.rmtree(staging)
+    for (name, directory) in directories.items():
+        _link_tree(directory, os.path.join(staging, name))
+    if os.path.isdir(snapshot):
+        # A snapshot missing one of the directories, such as one saved by an earlier version, is replaced.
+        shutil.rmtree(snapshot)
+    os.replace(staging, snapshot)
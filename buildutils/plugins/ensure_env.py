@@ -22,10 +22,11 @@ class EnsureVenvActivePlugin(Plugin):
 
     def __init__(self):
         super().__init__('ensure-virtual-env', 'Ensure build is being run from a specific virtual environment.')
+        self.section_name = 'ENSURE_VENV'
         self._name = None
 
     def load_config(self, config: ConfigParser):
-        self._name = PluginConfigHelper(self, config, 'ENSURE_VENV').prop('name')
+        self._name = PluginConfigHelper(self, config).prop('name')
         self._use_command(as_command('ensure-virtual-env-command', self._verify_proper_venv_active))
 
     def _verify_proper_venv_active(self) -> bool:
@@ -1,8 +1,10 @@
+from typing import Dict, List
+import json
 import subprocess
 from configparser import ConfigParser
 import re
 
-from buildutils.commands import Command, parse_python_command_string
+from buildutils.commands import Command, parse_python_command_string, get_process_environment
 
 from .base import Plugin
 from .config import PluginConfigHelper
@@ -13,37 +15,127 @@ class FlakePlugin(Plugin):
     """Plugin used to run a Flake8 linter against the project under test.
 
     This plugin looks for configuration values under the FLAKE8 section of the configuration file. From
-    that section pulls the values for the properties 'command' and 'fail_on_error'.
+    that section pulls the values for the properties 'engine', 'command', 'paths', 'fail_on_error', 'report_file', and
+    any property starting with 'max_'.
 
     In addition to the aforementioned properties the flake8 command will load configuration properties from the
     default setup.cfg file. To learn more about what properties are available take a look through the flake8
     documentation: https://flake8.pycqa.org/en/latest/user/index.html
 
-    command: specifies the exact Flake8 command to run such as: python -m flake8.
+    engine: specifies how flake8 is executed. Either 'process', the default, to run the command as a subprocess or
+    'api' to run flake8 within the build process using flake8's Python API. The api engine requires flake8 to be
+    installed in the environment executing the build.
+
+    command: specifies the exact Flake8 command to run such as: python -m flake8. Only used by the process engine.
+
+    paths: a comma delimited list of the files and directories to lint. Only used by the api engine. Defaults to the
+    current directory.
 
     fail_on_error: specifies if the plugin should emit an error if the flake command returns any errors or warnings.
     Can be true or false
+
+    report_file: an optional path to which the diagnostics will be written as a JSON list of objects containing the
+    path, line, column, code, and message of each diagnostic.
+
+    max_<code>: the maximum number of diagnostics allowed for a given code, or code prefix, before the build fails.
+    For example, max_E501 = 20 allows up to 20 E501 diagnostics and max_W = 0 fails the build on any warning. Codes
+    with a budget are exempt from the fail_on_error check.
     """
 
+    ENGINE_PROCESS = 'process'
+    ENGINE_API = 'api'
+
+    _BUDGET_PREFIX = 'max_'
+
     def __init__(self):
         super().__init__('flake8', 'Run flake8 against source files.')
+        self.section_name = 'FLAKE8'
 
     def load_config(self, config: ConfigParser):
-        helper = PluginConfigHelper(self, config, 'FLAKE8')
-        command = helper.prop('command')
+        helper = PluginConfigHelper(self, config)
+        engine = helper.prop('engine', FlakePlugin.ENGINE_PROCESS).lower()
         fail_on_error = helper.bool_prop('fail_on_error', 'False')
-        self._use_command(_FlakeCommand(command, fail_on_error))
+        budgets = {code.upper(): int(budget) for code, budget in helper.prefixed_props(FlakePlugin._BUDGET_PREFIX).items()}
+        report_file = helper.prop('report_file', '')
+        report_file = report_file if report_file != '' else None
+
+        if engine == FlakePlugin.ENGINE_API:
+            paths = [path.strip() for path in helper.list_prop('paths', default_value='.')]
+            self._use_command(_FlakeApiCommand(paths, fail_on_error, budgets, report_file))
+        elif engine == FlakePlugin.ENGINE_PROCESS:
+            command = helper.prop('command')
+            self._use_command(_FlakeCommand(command, fail_on_error, budgets, report_file))
+        else:
+            raise ValueError(f'Unsupported flake8 engine of: [{engine}]. Expected one of [process, api].')
+
+
+class LintDiagnostic:
+
+    """
+    A single diagnostic reported by flake8.
+    """
+
+    def __init__(self, path: str, line: int, column: int, code: str, message: str):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.code = code
+        self.message = message
 
+    def __repr__(self) -> str:
+        return f'{self.path}:{self.line}:{self.column}: {self.code} {self.message}'
 
-class _FlakeCommand(Command):
+    def to_dict(self) -> Dict[str, str | int]:
+        return {'path': self.path, 'line': self.line, 'column': self.column, 'code': self.code, 'message': self.message}
 
-    _ERROR_EXPRESSION = r'^.+:{1}[0-9]+:{1}[0-9]+(?::\sE){1}[0-9]+\s{1}.+$'
-    _FATAL_EXPRESSION = r'^.+:{1}[0-9]+:{1}[0-9]+(?::\sF){1}[0-9]+\s{1}.+$'
 
-    def __init__(self, command: str, fail_on_error: bool):
+class _BaseFlakeCommand(Command):
+
+    _FAILING_PREFIXES = ['E', 'F']
+
+    def __init__(self, fail_on_error: bool, budgets: Dict[str, int], report_file: str | None):
         super().__init__('run-flake')
-        self._command = command
         self._fail_on_error = fail_on_error
+        self._budgets = budgets
+        self._report_file = report_file
+
+    def _check_diagnostics(self, diagnostics: List[LintDiagnostic]) -> bool:
+        if self._report_file is not None:
+            with open(self._report_file, 'w') as file:
+                json.dump([diagnostic.to_dict() for diagnostic in diagnostics], file, indent=2)
+            print(f'Flake8 diagnostics have been written to [{self._report_file}]')
+
+        within_budget = True
+        for code, budget in self._budgets.items():
+            count = sum(1 for diagnostic in diagnostics if diagnostic.code.startswith(code))
+            if count > budget:
+                print(f'Found [{count}] [{code}] diagnostics which exceeds the maximum of [{budget}].')
+                within_budget = False
+        if not within_budget:
+            return False
+
+        if self._fail_on_error and self._contains_lint_error(diagnostics):
+            print('At least one linting error was identified when running flake8.')
+            print('You can continue the build when linting errors are present by setting the fail_on_error option under the [FLAKE8] config to False.')
+            return False
+        return True
+
+    def _contains_lint_error(self, diagnostics: List[LintDiagnostic]) -> bool:
+        for diagnostic in diagnostics:
+            if any(diagnostic.code.startswith(code) for code in self._budgets.keys()):
+                continue
+            if diagnostic.code[:1] in _BaseFlakeCommand._FAILING_PREFIXES:
+                return True
+        return False
+
+
+class _FlakeCommand(_BaseFlakeCommand):
+
+    _DIAGNOSTIC_EXPRESSION = re.compile(r'^(.+):([0-9]+):([0-9]+):\s([A-Z]+[0-9]+)\s(.+)$')
+
+    def __init__(self, command: str, fail_on_error: bool, budgets: Dict[str, int], report_file: str | None):
+        super().__init__(fail_on_error, budgets, report_file)
+        self._command = command
 
     def execute(self) -> bool:
         output = self._run_subprocess()
@@ -52,32 +144,64 @@ class _FlakeCommand(Command):
 
         if len(output) == 0:
             print('No linting errors to report.')
-            return True
+            return self._check_diagnostics([])
 
         print(f'Flask8 Lint: \n{output}')
+        return self._check_diagnostics(self._parse_diagnostics(output))
 
-        if self._fail_on_error and self._contains_lint_error(output):
-            print('At least one linting error was identified when running flake8.')
-            print('You can continue the build when linting errors are present by setting the fail_on_error option under the [FLAKE8] config to False.')
-            return False
-        return True
-
-    def _contains_lint_error(self, output: str) -> bool:
-        lines = output.split('\n')
-        for error_expression in [_FlakeCommand._ERROR_EXPRESSION, _FlakeCommand._FATAL_EXPRESSION]:
-            pattern = re.compile(error_expression)
-            first_match = next((line for line in lines if pattern.match(line) is not None), None)
-            if first_match is not None:
-                return True
-        return False
+    def _parse_diagnostics(self, output: str) -> List[LintDiagnostic]:
+        diagnostics = []
+        for line in output.split('\n'):
+            match = _FlakeCommand._DIAGNOSTIC_EXPRESSION.match(line)
+            if match is not None:
+                (path, line_number, column, code, message) = match.groups()
+                diagnostics.append(LintDiagnostic(path, int(line_number), int(column), code, message))
+        return diagnostics
 
     def _run_subprocess(self) -> str | None:
         parsed_command = parse_python_command_string(self._command)
         print(f'Executing subprocess with [{parsed_command}]')
-        process = subprocess.Popen(parsed_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, universal_newlines=True)
+        process = subprocess.Popen(parsed_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, universal_newlines=True,
+                                   env=get_process_environment())
         (output, err) = process.communicate()
         status = process.wait()
         if status != 0 and status != 1:
             print(f'Flake8 command completed with an error: [{err}]')
             return None
         return output
+
+
+class _FlakeApiCommand(_BaseFlakeCommand):
+
+    def __init__(self, paths: List[str], fail_on_error: bool, budgets: Dict[str, int], report_file: str | None):
+        super().__init__(fail_on_error, budgets, report_file)
+        self._paths = paths
+
+    def execute(self) -> bool:
+        try:
+            from flake8.api import legacy
+            from flake8.formatting.base import BaseFormatter
+        except ImportError:
+            print('The flake8 api engine requires flake8 to be installed in the environment executing the build.')
+            return False
+
+        diagnostics: List[LintDiagnostic] = []
+
+        class _CollectingFormatter(BaseFormatter):
+
+            def handle(self, error):
+                diagnostics.append(LintDiagnostic(error.filename, error.line_number, error.column_number, error.code, error.text))
+
+            def format(self, error):
+                return None
+
+        print(f'Running flake8 in-process against [{self._paths}]')
+        style_guide = legacy.get_style_guide()
+        style_guide.init_report(reporter=_CollectingFormatter)
+        style_guide.check_files(self._paths)
+
+        if len(diagnostics) == 0:
+            print('No linting errors to report.')
+        else:
+            print('Flake8 Lint:\n' + '\n'.join(str(diagnostic) for diagnostic in diagnostics))
+        return self._check_diagnostics(diagnostics)
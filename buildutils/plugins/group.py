@@ -23,6 +23,7 @@ class PluginGroup(Plugin):
 
     def load_config(self, config: ConfigParser):
         for plugin in self._actual_plugins:
+            plugin.reset_commands()
             plugin.load_config(config)
             command = as_command(f'{self.source_name}-{plugin.name}', plugin.execute)
             self._use_command(command)
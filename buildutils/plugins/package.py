@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+from typing import Dict, List, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from importlib import metadata
+import filecmp
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+
+from buildutils.build_context import get_build_context
+from buildutils.commands import Command, parse_python_command_string, get_process_environment, fingerprint
+from buildutils.source_index import SourceIndex
+
+from .base import Plugin
+from .config import PluginConfigHelper
+
+
+_SDIST_SUFFIX = '.tar.gz'
+_PAX_TIME_HEADERS = ['mtime', 'atime', 'ctime']
+
+
+class PackagePlugin(Plugin):
+
+    """Plugin used to build the sdist and wheel artifacts of one or more packages, reusing the previously built
+    artifacts when nothing they are built from has changed.
+
+    This plugin looks for configuration values under the PACKAGE section of the configuration file. From that
+    section it pulls the values for 'packages', 'command', 'output', 'sources', 'exclude', 'backend_packages',
+    'workers', 'verify_reproducible', and 'source_date_epoch'.
+
+    packages: A comma delimited list of the directories containing the packages to build. Defaults to the current
+    directory.
+
+    command: The command used to build a package. The {package} placeholder is replaced with the package directory
+    and the {output} placeholder with the directory the artifacts should be written to. Defaults to:
+    {PYTHON_VENV} -m build --sdist --wheel --outdir "{output}" "{package}"
+
+    output: The directory the artifacts of every package are placed in. Defaults to dist.
+
+    sources: A comma delimited list of glob patterns, relative to each package directory, of the files the package is
+    built from. Defaults to every file. The setup.py, setup.cfg, pyproject.toml, and MANIFEST.in files are always
+    included.
+
+    exclude: A comma delimited list of directory names that are never considered part of the package sources.
+    Defaults to build,dist,.git,.tox,.venv,venv,__pycache__ along with any directory ending in .egg-info.
+
+    backend_packages: A comma delimited list of the installed distributions whose versions are included in the
+    fingerprint. Defaults to build,setuptools,wheel.
+
+    workers: The maximum number of packages to build at the same time. Defaults to the number of packages.
+
+    verify_reproducible: If true each package is built twice and the build fails unless both builds produce
+    byte-for-byte identical artifacts. Defaults to true.
+
+    source_date_epoch: The timestamp exported as SOURCE_DATE_EPOCH to the build command so the timestamps embedded
+    in the artifacts do not depend on when they were built. Defaults to 315532800, the earliest time supported by
+    the zip format. Since not every build backend honours SOURCE_DATE_EPOCH when creating an sdist, gzipped tar
+    sdists are also rewritten with sorted entries, cleared owners, and timestamps clamped to this value.
+
+    The fingerprint of each package, along with the name and SHA-256 digest of each artifact, is recorded in a
+    manifest within the output directory. Artifacts are only reused when the fingerprint matches and the artifacts
+    in the output directory still match their recorded digests.
+    """
+
+    MANIFEST_FILE_NAME = '.buildutils-packages.json'
+
+    _METADATA_FILES = ['setup.py', 'setup.cfg', 'pyproject.toml', 'MANIFEST.in']
+    _EXCLUDED_SUFFIX = '.egg-info'
+
+    def __init__(self):
+        super().__init__('package', 'Build reproducible sdist and wheel artifacts when the package sources have changed.')
+        self.section_name = 'PACKAGE'
+
+    def load_config(self, config: ConfigParser):
+        helper = PluginConfigHelper(self, config)
+        packages = [package.strip() for package in helper.list_prop('packages', default_value='.')]
+        command = helper.prop('command', '{PYTHON_VENV} -m build --sdist --wheel --outdir "{output}" "{package}"')
+        output = helper.prop('output', 'dist')
+        sources = [pattern.strip() for pattern in helper.list_prop('sources', default_value='*')]
+        exclude = {name.strip() for name in helper.list_prop('exclude', default_value='build,dist,.git,.tox,.venv,venv,__pycache__')}
+        backend_packages = [name.strip() for name in helper.list_prop('backend_packages', default_value='build,setuptools,wheel')]
+        workers = helper.int_prop('workers', str(len(packages)))
+        verify_reproducible = helper.bool_prop('verify_reproducible', 'True')
+        source_date_epoch = helper.prop('source_date_epoch', '315532800')
+
+        self._use_command(_PackageCommand(
+            [_PackageSpec(package, sources, exclude, output) for package in packages],
+            command,
+            output,
+            _backend_versions(backend_packages),
+            workers,
+            verify_reproducible,
+            source_date_epoch
+        ))
+
+
+class _PackageSpec:
+
+    def __init__(self, directory: str, sources: List[str], exclude: Set[str], output: str):
+        self.directory = directory
+        self._sources = sources
+        self._exclude = exclude
+        self._output = os.path.abspath(output)
+
+    def fingerprint(self, extra_values: List[str]) -> str:
+        """
+        Computes the fingerprint of the package sources, reading the files from the source index of the build when
+        the package directory is within it. The package directory is walked again first since earlier plugins of the
+        build, such as code generators or version bumps, may have changed its files after the index was created.
+        """
+
+        context = get_build_context()
+        if context is not None:
+            index = context.source_index
+            directory = index.relative_path(self.directory)
+            if directory is not None:
+                index.refresh(directory)
+                return index.fingerprint(self._indexed_source_files(index, directory), extra_values)
+        return fingerprint(self.source_files(), extra_values)
+
+    def source_files(self) -> List[str]:
+        files = [os.path.join(self.directory, name) for name in PackagePlugin._METADATA_FILES]
+        for (root, directories, file_names) in os.walk(self.directory):
+            directories[:] = sorted(
+                name for name in directories
+                if name not in self._exclude and not name.endswith(PackagePlugin._EXCLUDED_SUFFIX)
+                and os.path.abspath(os.path.join(root, name)) != self._output
+            )
+            for file_name in sorted(file_names):
+                path = os.path.join(root, file_name)
+                relative_path = os.path.relpath(path, self.directory)
+                if file_name not in PackagePlugin._METADATA_FILES and any(fnmatch.fnmatch(relative_path, pattern) for pattern in self._sources):
+                    files.append(path)
+        return files
+
+    def _indexed_source_files(self, index: SourceIndex, directory: str) -> List[str]:
+        prefix = directory + '/' if directory != '' else ''
+        output = index.relative_path(self._output)
+        files = [prefix + name for name in PackagePlugin._METADATA_FILES]
+        for entry in index.files(directory=directory):
+            relative_path = entry.path[len(prefix):]
+            *directories, file_name = relative_path.split('/')
+            if any(name in self._exclude or name.endswith(PackagePlugin._EXCLUDED_SUFFIX) for name in directories):
+                continue
+            if output is not None and output != '' and entry.path.startswith(output + '/'):
+                continue
+            if file_name not in PackagePlugin._METADATA_FILES and any(fnmatch.fnmatch(relative_path, pattern) for pattern in self._sources):
+                files.append(entry.path)
+        return files
+
+
+class _PackageResult:
+
+    def __init__(self, directory: str, success: bool, output: str, fingerprint: str, artifacts: Dict[str, str] | None = None):
+        self.directory = directory
+        self.success = success
+        self.output = output
+        self.fingerprint = fingerprint
+        self.artifacts = artifacts or {}
+
+
+class _PackageCommand(Command):
+
+    def __init__(self, packages: List[_PackageSpec], command: str, output: str, backend_versions: List[str], workers: int,
+                 verify_reproducible: bool, source_date_epoch: str):
+        super().__init__('package-command')
+        self._packages = packages
+        self._command = command
+        self._output = output
+        self._backend_versions = backend_versions
+        self._workers = max(workers, 1)
+        self._verify_reproducible = verify_reproducible
+        self._source_date_epoch = source_date_epoch
+
+    def execute(self) -> bool:
+        os.makedirs(self._output, exist_ok=True)
+        manifest_file = os.path.join(self._output, PackagePlugin.MANIFEST_FILE_NAME)
+        manifest = _read_manifest(manifest_file)
+
+        pending: List[Tuple[_PackageSpec, str]] = []
+        for package in self._packages:
+            current_fingerprint = package.fingerprint([parse_python_command_string(self._command), self._source_date_epoch, *self._backend_versions])
+            if self._has_cached_artifacts(manifest.get(package.directory), current_fingerprint):
+                print(f'Artifacts of [{package.directory}] are up to date. Reusing [{list(manifest[package.directory]["artifacts"])}]')
+                continue
+            pending.append((package, current_fingerprint))
+
+        if len(pending) == 0:
+            return True
+
+        print(f'Building [{len(pending)}] package(s) with up to [{self._workers}] worker(s)')
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            results = list(executor.map(lambda entry: self._build_package(*entry), pending))
+
+        success = True
+        for result in results:
+            print(f'\n--------------- Package: {result.directory} ---------------\n{result.output}')
+            if not result.success:
+                success = False
+                continue
+            self._publish(manifest.get(result.directory), result)
+            manifest[result.directory] = {'fingerprint': result.fingerprint, 'artifacts': result.artifacts}
+
+        with open(manifest_file, 'w') as file:
+            json.dump(manifest, file, indent=2)
+        return success
+
+    def _has_cached_artifacts(self, entry: Dict | None, current_fingerprint: str) -> bool:
+        if entry is None or entry['fingerprint'] != current_fingerprint:
+            return False
+        for (name, digest) in entry['artifacts'].items():
+            path = os.path.join(self._output, name)
+            if not os.path.isfile(path) or _file_digest(path) != digest:
+                print(f'Cached artifact [{path}] is missing or has been modified.')
+                return False
+        return True
+
+    def _build_package(self, package: _PackageSpec, current_fingerprint: str) -> _PackageResult:
+        staging_directory = tempfile.mkdtemp(prefix='buildutils-package-')
+        try:
+            first_build = os.path.join(staging_directory, 'first')
+            (success, output) = self._run_build(package, first_build)
+            if not success:
+                return _PackageResult(package.directory, False, output, current_fingerprint)
+
+            if self._verify_reproducible:
+                second_build = os.path.join(staging_directory, 'second')
+                (success, second_output) = self._run_build(package, second_build)
+                output += second_output
+                if not success:
+                    return _PackageResult(package.directory, False, output, current_fingerprint)
+                differences = _compare_builds(first_build, second_build)
+                if len(differences) > 0:
+                    output += f'The artifacts [{differences}] are not reproducible. The two builds produced different bytes.\n'
+                    return _PackageResult(package.directory, False, output, current_fingerprint)
+                output += 'Verified the artifacts are reproducible.\n'
+
+            artifacts: Dict[str, str] = {}
+            for name in sorted(os.listdir(first_build)):
+                artifacts[name] = _file_digest(os.path.join(first_build, name))
+                shutil.move(os.path.join(first_build, name), os.path.join(self._output, name))
+            return _PackageResult(package.directory, True, output, current_fingerprint, artifacts)
+        finally:
+            shutil.rmtree(staging_directory, ignore_errors=True)
+
+    def _run_build(self, package: _PackageSpec, output_directory: str) -> Tuple[bool, str]:
+        command = parse_python_command_string(self._command).replace('{package}', package.directory).replace('{output}', output_directory)
+        environment = dict(get_process_environment() or os.environ)
+        environment['SOURCE_DATE_EPOCH'] = self._source_date_epoch
+        process = subprocess.run(command, shell=True, env=environment, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                 universal_newlines=True)
+        output = f'Executed [{command}]\n{process.stdout}'
+        if process.returncode != 0:
+            return (False, output + f'Package build failed with exit status [{process.returncode}]\n')
+        if not os.path.isdir(output_directory) or len(os.listdir(output_directory)) == 0:
+            return (False, output + f'Package build did not produce any artifacts in [{output_directory}]\n')
+        for name in os.listdir(output_directory):
+            if name.endswith(_SDIST_SUFFIX):
+                _normalize_sdist(os.path.join(output_directory, name), int(self._source_date_epoch))
+        return (True, output)
+
+    def _publish(self, previous_entry: Dict | None, result: _PackageResult):
+        if previous_entry is None:
+            return
+        for name in previous_entry['artifacts']:
+            path = os.path.join(self._output, name)
+            if name not in result.artifacts and os.path.isfile(path):
+                print(f'Removing outdated artifact [{path}]')
+                os.remove(path)
+
+
+def _backend_versions(names: List[str]) -> List[str]:
+    versions = []
+    for name in names:
+        try:
+            versions.append(f'{name}=={metadata.version(name)}')
+        except metadata.PackageNotFoundError:
+            versions.append(f'{name} not installed')
+    return versions
+
+
+def _normalize_sdist(path: str, source_date_epoch: int):
+    """
+    Rewrites a gzipped tar sdist so its contents do not depend on when, or by whom, it was built. The entries are
+    sorted, their owners cleared, their modification times clamped to the source date epoch, and the gzip header
+    timestamp set to the source date epoch.
+    """
+
+    normalized_path = f'{path}.normalized'
+    with tarfile.open(path, 'r:gz') as source, open(normalized_path, 'wb') as raw_file:
+        with gzip.GzipFile(filename='', mode='wb', fileobj=raw_file, mtime=source_date_epoch) as compressed_file:
+            with tarfile.open(fileobj=compressed_file, mode='w', format=source.format) as target:
+                for member in sorted(source.getmembers(), key=lambda entry: entry.name):
+                    member.mtime = min(int(member.mtime), source_date_epoch)
+                    member.uid = member.gid = 0
+                    member.uname = member.gname = ''
+                    member.pax_headers = {key: value for (key, value) in member.pax_headers.items() if key not in _PAX_TIME_HEADERS}
+                    target.addfile(member, source.extractfile(member) if member.isfile() else None)
+    os.replace(normalized_path, path)
+
+
+def _compare_builds(first_directory: str, second_directory: str) -> List[str]:
+    first_names = set(os.listdir(first_directory))
+    second_names = set(os.listdir(second_directory))
+    differences = sorted(first_names.symmetric_difference(second_names))
+    for name in sorted(first_names.intersection(second_names)):
+        if not filecmp.cmp(os.path.join(first_directory, name), os.path.join(second_directory, name), shallow=False):
+            differences.append(name)
+    return differences
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(path: str) -> Dict[str, Dict]:
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        print(f'Could not read package manifest [{path}]. All packages will be rebuilt.')
+        return {}
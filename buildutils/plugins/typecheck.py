@@ -0,0 +1,250 @@
+from typing import Dict, List, Tuple
+from configparser import ConfigParser
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+
+from buildutils.commands import Command, parse_python_command_string, get_process_environment, fingerprint, matrix_artifact_path
+
+from .base import Plugin
+from .config import PluginConfigHelper
+
+
+class TypeCheckPlugin(Plugin):
+
+    """Plugin used to type check the project using the mypy daemon.
+
+    This plugin looks for configuration values under the MYPY section of the configuration file. From that section
+    it pulls the values for the properties 'command', 'paths', 'config_file', 'flags', 'status_file', 'timeout',
+    'report_file', 'max_errors', and any other property starting with 'max_'.
+
+    The daemon is left running after the build completes so the following builds only need to recheck the files that
+    have changed. The daemon is restarted when the command, the interpreter it resolves to, the flags, or the contents
+    of the mypy configuration file differ from those the daemon was started with.
+
+    command: specifies the command used to run the mypy daemon client. Defaults to: {PYTHON_VENV} -m mypy.dmypy
+
+    paths: a comma delimited list of the files and directories to type check. Defaults to the current directory.
+
+    config_file: the mypy configuration file. Defaults to the first of mypy.ini, .mypy.ini, pyproject.toml, and
+    setup.cfg that exists.
+
+    flags: additional mypy flags, such as --strict, the daemon should be started with.
+
+    status_file: the file the daemon records its process and connection details in. Defaults to .dmypy.json.
+
+    timeout: an optional number of seconds of inactivity after which the daemon will shut itself down.
+
+    report_file: an optional path to which the errors will be written as a JSON list of objects containing the path,
+    line, column, severity, code, and message of each error.
+
+    max_errors: the maximum number of errors allowed before the build fails. Defaults to 0.
+
+    max_<code>: the maximum number of errors allowed for a given mypy error code, such as max_arg-type = 5. Errors
+    with a code that has a budget are not counted towards max_errors.
+    """
+
+    _BUDGET_PREFIX = 'max_'
+    _TOTAL_BUDGET = 'errors'
+    _CONFIG_FILES = ['mypy.ini', '.mypy.ini', 'pyproject.toml', 'setup.cfg']
+
+    def __init__(self):
+        super().__init__('mypy', 'Type check source files using the mypy daemon.')
+        self.section_name = 'MYPY'
+
+    def load_config(self, config: ConfigParser):
+        helper = PluginConfigHelper(self, config)
+        command = helper.prop('command', '{PYTHON_VENV} -m mypy.dmypy')
+        paths = [path.strip() for path in helper.list_prop('paths', default_value='.')]
+        config_file = helper.prop('config_file', '')
+        if config_file == '':
+            config_file = next((file for file in TypeCheckPlugin._CONFIG_FILES if os.path.isfile(file)), None)
+        flags = helper.prop('flags', '')
+        status_file = helper.prop('status_file', matrix_artifact_path('.dmypy.json'))
+        timeout = helper.prop('timeout', '')
+        report_file = helper.prop('report_file', '')
+
+        budgets = {code.lower(): int(budget) for code, budget in helper.prefixed_props(TypeCheckPlugin._BUDGET_PREFIX).items()}
+        max_errors = budgets.pop(TypeCheckPlugin._TOTAL_BUDGET, 0)
+
+        daemon = _MypyDaemon(command, status_file, config_file, flags, timeout if timeout != '' else None)
+        self._use_command(_TypeCheckCommand(daemon, paths, max_errors, budgets, report_file if report_file != '' else None))
+
+
+class TypeDiagnostic:
+
+    """
+    A single error or note reported by mypy.
+    """
+
+    def __init__(self, path: str, line: int, column: int, severity: str, code: str | None, message: str):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.code = code
+        self.message = message
+
+    def __repr__(self) -> str:
+        code = f'  [{self.code}]' if self.code is not None else ''
+        return f'{self.path}:{self.line}:{self.column}: {self.severity}: {self.message}{code}'
+
+    def to_dict(self) -> Dict[str, str | int | None]:
+        return {'path': self.path, 'line': self.line, 'column': self.column, 'severity': self.severity, 'code': self.code, 'message': self.message}
+
+
+class _MypyDaemon:
+
+    """
+    Wraps the dmypy client commands for a single daemon identified by its status file.
+    """
+
+    def __init__(self, command: str, status_file: str, config_file: str | None, flags: str, timeout: str | None):
+        self._command = parse_python_command_string(command)
+        self._status_file = status_file
+        self._config_file = config_file
+        self._flags = flags
+        self._timeout = timeout
+        self._fingerprint_file = f'{status_file}.sha256'
+
+    def ensure_current(self):
+        """
+        Stops the daemon if it was started with a different command, interpreter, flags, or configuration so the next
+        check will start a new daemon.
+        """
+
+        config_files = [self._config_file] if self._config_file is not None else []
+        current_fingerprint = fingerprint(config_files, [self._command, self._flags, self._timeout or '', self._interpreter_version()])
+        if _read_fingerprint(self._fingerprint_file) == current_fingerprint:
+            return
+
+        if os.path.isfile(self._status_file):
+            print('The mypy configuration or interpreter has changed since the daemon was started. Restarting the daemon.')
+            (status, _) = self._client('stop')
+            if status != 0:
+                self._client('kill')
+        with open(self._fingerprint_file, 'w') as file:
+            file.write(current_fingerprint)
+
+    def _interpreter_version(self) -> str:
+        """
+        Gets the path and version of the interpreter the daemon runs on, so recreating an environment with a different
+        Python restarts the daemon even when the command itself is unchanged. This is the interpreter the command
+        starts, or for commands such as a bare dmypy the interpreter of the active virtual environment or of the build.
+        """
+
+        interpreter = _command_interpreter(self._command)
+        if interpreter is None:
+            venv_python = parse_python_command_string('{PYTHON_VENV}')
+            interpreter = venv_python if venv_python != '{PYTHON_VENV}' else sys.executable
+        try:
+            version = subprocess.run([interpreter, '-c', 'import sys; print(sys.version)'], stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, universal_newlines=True, env=get_process_environment()).stdout
+        except OSError:
+            version = ''
+        return f'{interpreter}\0{version.strip()}'
+
+    def run(self, paths: List[str]) -> Tuple[int, str]:
+        """
+        Checks the paths, starting the daemon if it is not already running.
+
+        Returns:
+            The exit status of the client, 0 when no errors were found, 1 when errors were found, and 2 when the check
+            could not be completed, along with the output of the check.
+        """
+
+        arguments = ['run']
+        if self._timeout is not None:
+            arguments.append(f'--timeout {self._timeout}')
+        arguments.append('-- --show-column-numbers --show-error-codes --no-error-summary --no-pretty')
+        if self._config_file is not None:
+            arguments.append(f'--config-file "{self._config_file}"')
+        if self._flags != '':
+            arguments.append(self._flags)
+        arguments.extend(f'"{path}"' for path in paths)
+        return self._client(' '.join(arguments))
+
+    def _client(self, arguments: str) -> Tuple[int, str]:
+        command = f'{self._command} --status-file "{self._status_file}" {arguments}'
+        print(f'Executing subprocess with [{command}]')
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True, universal_newlines=True,
+                                   env=get_process_environment())
+        (output, _) = process.communicate()
+        return (process.wait(), output)
+
+
+def _command_interpreter(command: str) -> str | None:
+    try:
+        executable = shlex.split(command, posix=os.name != 'nt')[0].strip('"')
+    except (ValueError, IndexError):
+        return None
+    if re.match(r'^(python[0-9.]*|py)(\.exe)?$', os.path.basename(executable).lower()) is None:
+        return None
+    return executable
+
+
+class _TypeCheckCommand(Command):
+
+    _DIAGNOSTIC_EXPRESSION = re.compile(r'^(.+?):([0-9]+):([0-9]+): (error|note): (.*?)(?:  \[([a-z0-9-]+)\])?$')
+    _STATUS_CLEAN = 0
+    _STATUS_ERRORS = 1
+
+    def __init__(self, daemon: _MypyDaemon, paths: List[str], max_errors: int, budgets: Dict[str, int], report_file: str | None):
+        super().__init__('run-mypy')
+        self._daemon = daemon
+        self._paths = paths
+        self._max_errors = max_errors
+        self._budgets = budgets
+        self._report_file = report_file
+
+    def execute(self) -> bool:
+        self._daemon.ensure_current()
+        (status, output) = self._daemon.run(self._paths)
+        if status not in [_TypeCheckCommand._STATUS_CLEAN, _TypeCheckCommand._STATUS_ERRORS]:
+            print(f'Mypy daemon completed with an error: [{output}]')
+            return False
+
+        diagnostics = self._parse_diagnostics(output)
+        if len(diagnostics) == 0:
+            print('No type errors to report.')
+        else:
+            print('Mypy:\n' + '\n'.join(str(diagnostic) for diagnostic in diagnostics))
+        return self._check_diagnostics([diagnostic for diagnostic in diagnostics if diagnostic.severity == 'error'])
+
+    def _parse_diagnostics(self, output: str) -> List[TypeDiagnostic]:
+        diagnostics = []
+        for line in output.split('\n'):
+            match = _TypeCheckCommand._DIAGNOSTIC_EXPRESSION.match(line)
+            if match is not None:
+                (path, line_number, column, severity, message, code) = match.groups()
+                diagnostics.append(TypeDiagnostic(path, int(line_number), int(column), severity, code, message))
+        return diagnostics
+
+    def _check_diagnostics(self, errors: List[TypeDiagnostic]) -> bool:
+        if self._report_file is not None:
+            with open(self._report_file, 'w') as file:
+                json.dump([error.to_dict() for error in errors], file, indent=2)
+            print(f'Mypy errors have been written to [{self._report_file}]')
+
+        within_budget = True
+        for code, budget in self._budgets.items():
+            count = sum(1 for error in errors if error.code == code)
+            if count > budget:
+                print(f'Found [{count}] [{code}] errors which exceeds the maximum of [{budget}].')
+                within_budget = False
+
+        remaining = sum(1 for error in errors if error.code not in self._budgets)
+        if remaining > self._max_errors:
+            print(f'Found [{remaining}] type errors which exceeds the maximum of [{self._max_errors}].')
+            within_budget = False
+        return within_budget
+
+
+def _read_fingerprint(path: str) -> str | None:
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r') as file:
+        return file.read().strip()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from typing import Any, Callable, List, Tuple
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+
+class CommandProfile:
+
+    """
+    The measurements captured while profiling a single in-process command.
+    """
+
+    def __init__(self, command_name: str, duration: float):
+        self.command_name = command_name
+        self.duration = duration
+        self.hotspots: List[Tuple[str, float]] = []
+        self.peak_memory: int | None = None
+        self.stats_file: str | None = None
+        self.allocations_file: str | None = None
+
+
+class CommandProfiler:
+
+    """
+    Wraps the execution of in-process commands, such as those created through as_command and as_plugin, with
+    cProfile and/or tracemalloc.
+
+    For every profiled command a .pstats file and/or a snapshot of the top memory allocations will be written to the
+    output directory. A short summary of the hotspots can be printed once the build has completed.
+    """
+
+    MODE_CPU = 'cpu'
+    MODE_MEMORY = 'memory'
+    MODE_ALL = 'all'
+
+    _ALL_COMMANDS = '*'
+    _PLUGIN_COMMAND_SUFFIX = '-command'
+    _SUMMARY_HOTSPOT_COUNT = 3
+
+    def __init__(self, command_names: str, mode: str = MODE_ALL, output_directory: str = 'build-profiles', top_allocations: int = 10):
+        """
+        Initializes the command profiler.
+
+        Args:
+            command_names (str): A comma delimited list of the names of the commands to profile or * to profile all
+                in-process commands. The name of a plugin created through as_plugin can be used in place of the name
+                of the command it wraps.
+            mode (str): Specifies what to profile. Can be cpu, memory, or all.
+            output_directory (str): The directory the .pstats and allocation snapshot files will be written to.
+            top_allocations (int): The number of the largest allocation sites to record in each snapshot.
+        """
+
+        if mode not in [CommandProfiler.MODE_CPU, CommandProfiler.MODE_MEMORY, CommandProfiler.MODE_ALL]:
+            raise ValueError(f'Unsupported profiling mode of: [{mode}]')
+        self._command_names = [name.strip().lower().replace(' ', '_') for name in command_names.split(',') if name.strip() != '']
+        self._mode = mode
+        self._output_directory = output_directory
+        self._top_allocations = top_allocations
+        self._profiles: List[CommandProfile] = []
+        self._active = False
+
+    def should_profile(self, command_name: str) -> bool:
+        if self._active:
+            # cProfile and tracemalloc cannot be nested, so commands executed by an already profiled command, such as
+            # those within a plugin group, are accounted for in the profile of the outer command.
+            return False
+        if CommandProfiler._ALL_COMMANDS in self._command_names:
+            return True
+        if command_name in self._command_names:
+            return True
+        return command_name.endswith(CommandProfiler._PLUGIN_COMMAND_SUFFIX)\
+            and command_name[:-len(CommandProfiler._PLUGIN_COMMAND_SUFFIX)] in self._command_names
+
+    def profile(self, command_name: str, function: Callable[[], Any]) -> Any:
+        """
+        Executes the function while capturing the cpu and/or memory profile of the execution.
+
+        Args:
+            command_name (str): The name of the command being profiled. Used to name the output files.
+            function (Callable[[], Any]): The function to execute and profile.
+
+        Returns:
+            The value returned by the function.
+        """
+
+        os.makedirs(self._output_directory, exist_ok=True)
+        profile_cpu = self._mode in [CommandProfiler.MODE_CPU, CommandProfiler.MODE_ALL]
+        profile_memory = self._mode in [CommandProfiler.MODE_MEMORY, CommandProfiler.MODE_ALL]
+
+        profiler = cProfile.Profile() if profile_cpu else None
+        started_tracing = False
+        if profile_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+
+        self._active = True
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                return profiler.runcall(function)
+            return function()
+        finally:
+            result = CommandProfile(command_name, time.perf_counter() - start)
+            self._active = False
+            if profile_memory:
+                self._record_allocations(result, started_tracing)
+            if profiler is not None:
+                self._record_stats(result, profiler)
+            self._profiles.append(result)
+
+    def _record_stats(self, result: CommandProfile, profiler: cProfile.Profile):
+        result.stats_file = os.path.join(self._output_directory, f'{result.command_name}.pstats')
+        profiler.dump_stats(result.stats_file)
+
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        entries = sorted((entry for entry in stats.stats.items() if entry[0][0] != '~'), key=lambda entry: entry[1][3], reverse=True)
+        for (file_name, line, function_name), (_, _, _, cumulative_time, _) in entries[:CommandProfiler._SUMMARY_HOTSPOT_COUNT]:
+            result.hotspots.append((f'{os.path.basename(file_name)}:{line}({function_name})', cumulative_time))
+
+    def _record_allocations(self, result: CommandProfile, started_tracing: bool):
+        snapshot = tracemalloc.take_snapshot()
+        (_, result.peak_memory) = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+        result.allocations_file = os.path.join(self._output_directory, f'{result.command_name}.allocations.txt')
+        with open(result.allocations_file, 'w') as file:
+            file.write(f'Peak traced memory: {result.peak_memory} bytes\n')
+            for statistic in snapshot.statistics('lineno')[:self._top_allocations]:
+                file.write(f'{statistic}\n')
+
+    def print_summary(self):
+        """
+        Prints a short summary of the duration, hotspots, and peak memory of each profiled command.
+        """
+
+        if len(self._profiles) == 0:
+            print('No in-process commands were profiled.')
+            return
+        print('\n--------------- Command Profiling Summary ---------------')
+        for result in sorted(self._profiles, key=lambda profile: profile.duration, reverse=True):
+            print(f'[{result.command_name}] completed in [{result.duration:.3f}]s')
+            for hotspot, cumulative_time in result.hotspots:
+                print(f'\t{cumulative_time:.3f}s cumulative - {hotspot}')
+            if result.peak_memory is not None:
+                print(f'\tPeak traced memory: [{result.peak_memory / 1024:.1f}] KiB')
+            for output_file in [result.stats_file, result.allocations_file]:
+                if output_file is not None:
+                    print(f'\tWritten to: [{output_file}]')
+        print('--------------- ---------------')
+
+
+_active_profiler: CommandProfiler | None = None
+
+
+def get_active_profiler() -> CommandProfiler | None:
+    return _active_profiler
+
+
+def set_active_profiler(profiler: CommandProfiler | None):
+    """
+    Sets the profiler in-process commands should be executed through. When no profiler is set, the default, the
+    in-process commands will be executed directly without any profiling overhead.
+    """
+
+    global _active_profiler
+    _active_profiler = profiler
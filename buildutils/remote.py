@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+import hmac
+import ipaddress
+import json
+import os
+import queue
+import socket
+import socketserver
+import subprocess
+import threading
+import time
+
+from buildutils.exceptions import WorkerLostException
+from buildutils.commands.base.process_environment import get_exported_environment_variables
+
+
+_PROTOCOL_VERSION = 1
+_HEARTBEAT_INTERVAL = 10
+
+
+def _send(stream, message: Dict):
+    stream.write(json.dumps(message) + '\n')
+    stream.flush()
+
+
+def _receive(stream) -> Dict | None:
+    line = stream.readline()
+    if line == '':
+        return None
+    return json.loads(line)
+
+
+class _WorkerRequestHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        with self.request.makefile('rw', encoding='utf-8', newline='\n') as stream:
+            request = _receive(stream)
+            if request is None:
+                return
+            if request.get('version') != _PROTOCOL_VERSION:
+                _send(stream, {'type': 'error', 'message': f'Unsupported protocol version [{request.get("version")}]'})
+                return
+            if not hmac.compare_digest(str(request.get('token', '')), self.server.token):
+                _send(stream, {'type': 'error', 'message': 'Invalid worker token.'})
+                return
+
+            working_directory = request['cwd']
+            if not os.path.isdir(working_directory):
+                _send(stream, {'type': 'error', 'message': f'Working directory [{working_directory}] does not exist on the worker.'})
+                return
+
+            environment = dict(os.environ)
+            environment.update(request.get('env', {}))
+            print(f'Executing [{request["command"]}] in [{working_directory}]')
+            process = subprocess.Popen(request['command'], cwd=working_directory, env=environment, shell=True,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+            # The output is read on a separate thread so a heartbeat can be sent whenever the command is silent for a
+            # while, letting the coordinator tell a long running command apart from a lost worker.
+            lines: queue.Queue = queue.Queue()
+            threading.Thread(target=_read_lines, args=(process.stdout, lines), daemon=True).start()
+            while True:
+                try:
+                    line = lines.get(timeout=_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    _send(stream, {'type': 'heartbeat'})
+                    continue
+                if line is None:
+                    break
+                _send(stream, {'type': 'output', 'line': line})
+            _send(stream, {'type': 'exit', 'status': process.wait()})
+
+
+def _read_lines(output, lines: queue.Queue):
+    for line in output:
+        lines.put(line)
+    lines.put(None)
+
+
+class _WorkerServer(socketserver.ThreadingTCPServer):
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], token: str):
+        super().__init__(address, _WorkerRequestHandler)
+        self.token = token
+
+
+def run_worker(host: str = '127.0.0.1', port: int = 8765, token: str = ''):
+    """
+    Starts a worker that listens for commands sent by a build coordinator and executes them.
+
+    The worker will execute any command it is sent so it should only listen on an interface reachable by trusted
+    coordinators. A token shared with the coordinators is required unless the worker only listens on a loopback
+    interface.
+
+    Args:
+        host (str): The interface to listen on. Defaults to localhost.
+        port (int): The port to listen on.
+        token (str): A secret the coordinator must send along with every command.
+
+    Raises:
+        ValueError: If no token was provided for a host that is reachable from other machines.
+    """
+
+    if token == '' and not _is_loopback(host):
+        raise ValueError(f'A token is required when the worker listens on the non-loopback host [{host}].')
+    with _WorkerServer((host, port), token) as server:
+        print(f'Worker listening on [{host}:{port}]')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print('Worker stopped.')
+
+
+def _is_loopback(host: str) -> bool:
+    if host == '':
+        return False
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except OSError:
+        return False
+    return all(ipaddress.ip_address(address.split('%')[0]).is_loopback for address in addresses)
+
+
+class RemoteDispatcher:
+
+    """
+    Sends process commands to a set of registered workers, streams back their output, and returns their exit status.
+
+    Commands are assigned to the workers in a round-robin fashion. If the connection to a worker is lost, or a worker
+    cannot be reached, the command is retried on the next worker until every worker has been tried. A lost worker is
+    not sent any further commands until the retry interval has passed, unless every worker has been lost. Since a worker may have been lost part way
+    through executing a command the commands should be safe to execute more than once.
+
+    The runner executes plugins, and so sends commands, one at a time. Workers move the execution of the commands off
+    the machine running the build and provide failover between machines but adding workers does not make a build
+    faster.
+
+    The working directory of the build is sent as a shared path reference so the workers must have access to the same
+    path, such as through a network share or, when testing, by running on the same machine. Only the environment
+    variables exported by the build are sent, the command otherwise runs with the environment of the worker.
+
+    Workers send a heartbeat whenever a command has not written any output for a while, so a worker is considered lost
+    once nothing has been received from it for longer than the read timeout.
+    """
+
+    def __init__(self, addresses: List[str], token: str = '', connect_timeout: float = 10, read_timeout: float = 60,
+                 retry_interval: float = 300):
+        """
+        Initializes the remote dispatcher.
+
+        Args:
+            addresses (List[str]): The host:port addresses of the workers.
+            token (str): The secret shared with the workers.
+            connect_timeout (float): The number of seconds to wait when connecting to a worker.
+            read_timeout (float): The number of seconds to wait for any message, including heartbeats, from a worker
+                before considering it lost.
+            retry_interval (float): The number of seconds a lost worker is excluded from receiving commands.
+        """
+
+        if len(addresses) == 0:
+            raise ValueError('At least one worker address is required.')
+        self._addresses = addresses
+        self._token = token
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._retry_interval = retry_interval
+        self._lost_until: Dict[str, float] = {}
+        self._next_worker = 0
+
+    def run(self, command: str) -> int:
+        """
+        Executes the command on one of the workers.
+
+        Returns:
+            The exit status of the command.
+
+        Raises:
+            WorkerLostException: If the command could not be completed on any of the workers.
+        """
+
+        ordered = self._addresses[self._next_worker:] + self._addresses[:self._next_worker]
+        self._next_worker = (self._next_worker + 1) % len(self._addresses)
+        now = time.monotonic()
+        # When every worker has been lost they are all tried again rather than failing without trying any of them.
+        addresses = [address for address in ordered if now >= self._lost_until.get(address, 0)] or ordered
+        last_error: WorkerLostException | None = None
+        for address in addresses:
+            try:
+                return self._run_on_worker(address, command)
+            except WorkerLostException as e:
+                print(f'{e}. Not sending commands to it for [{self._retry_interval}] seconds. Retrying on the next worker.')
+                self._lost_until[address] = time.monotonic() + self._retry_interval
+                last_error = e
+        raise last_error
+
+    def _run_on_worker(self, address: str, command: str) -> int:
+        (host, port) = address.rsplit(':', 1)
+        print(f'Dispatching [{command}] to worker [{address}]')
+        try:
+            with socket.create_connection((host, int(port)), timeout=self._connect_timeout) as connection:
+                # Commands can run for a long time without output but the worker sends heartbeats in the meantime.
+                connection.settimeout(self._read_timeout)
+                with connection.makefile('rw', encoding='utf-8', newline='\n') as stream:
+                    _send(stream, {
+                        'version': _PROTOCOL_VERSION,
+                        'token': self._token,
+                        'command': command,
+                        'cwd': os.getcwd(),
+                        'env': get_exported_environment_variables(),
+                    })
+                    return self._read_result(address, stream)
+        except (OSError, ValueError) as e:
+            raise WorkerLostException(address, str(e))
+
+    def _read_result(self, address: str, stream) -> int:
+        while True:
+            message = _receive(stream)
+            if message is None:
+                raise WorkerLostException(address, 'connection closed before the command completed')
+            if message['type'] == 'output':
+                print(message['line'], end='')
+            elif message['type'] == 'heartbeat':
+                continue
+            elif message['type'] == 'exit':
+                return message['status']
+            elif message['type'] == 'error':
+                raise WorkerLostException(address, message['message'])
+
+
+_active_dispatcher: RemoteDispatcher | None = None
+
+
+def get_active_dispatcher() -> RemoteDispatcher | None:
+    return _active_dispatcher
+
+
+def set_active_dispatcher(dispatcher: RemoteDispatcher | None):
+    """
+    Sets the dispatcher process commands should be sent through. When no dispatcher is set, the default, the process
+    commands will be executed locally.
+    """
+
+    global _active_dispatcher
+    _active_dispatcher = dispatcher
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, List
 
 import sys
 import os
-from configparser import ConfigParser
+import time
+from configparser import ConfigParser, SectionProxy
 
 from buildutils.plugins import Plugin
+from buildutils.plugins.declarative import PluginDeclaration, PluginFactory, DEFAULT_PLUGIN_TYPES, read_plugin_declarations, normalize_plugin_name
+from buildutils.profiling import CommandProfiler, set_active_profiler
+from buildutils.checkpoint import BuildCheckpoint
+from buildutils.scratch import ScratchWorkspace
+from buildutils.timings import BuildTimings
+from buildutils.plan import BuildPlan, PlannedStep, read_dependencies
+from buildutils.remote import RemoteDispatcher, set_active_dispatcher
+from buildutils.build_context import BuildContext, set_build_context
+from buildutils.commands import clear_exported_environment_variables
 from buildutils.exceptions import (
     PluginNotFoundException,
     ProfileNotFoundException,
@@ -28,23 +38,91 @@ class BuildConfiguration:
 
     def __init__(self):
         self._plugins: List[Plugin] = []
+        self._plugin_index: Dict[str, Plugin] = {}
+        self._declared_plugins: Dict[str, Plugin] = {}
+        self._plugin_types: Dict[str, PluginFactory] = dict(DEFAULT_PLUGIN_TYPES)
+        self._declarations: Dict[str, PluginDeclaration] | None = None
         self._config_file = BuildConfiguration._DEFAULT_CONFIG_FILE
+        self._config_defaults: Dict[str, Dict[str, str]] = {}
+        self._config_parser: ConfigParser | None = None
+        self._dispatcher: RemoteDispatcher | None = None
 
     def config(self, config_file: str) -> BuildConfiguration:
         self._config_file = config_file
+        self._clear_config_cache()
+        return self
+
+    def config_defaults(self, sections: Dict[str, Dict[str, str]]) -> BuildConfiguration:
+        """
+        Sets default values for the configuration file. The defaults are merged key by key, so a section in the
+        configuration file only overrides the default properties it sets itself and keeps the rest.
+
+        Args:
+            sections (Dict[str, Dict[str, str]]): The default properties keyed by section name and then property name.
+        """
+
+        self._config_defaults = sections
+        self._clear_config_cache()
+        return self
+
+    def plugin_type(self, name: str, factory: PluginFactory) -> BuildConfiguration:
+        """
+        Registers a type of plugin that can be declared within the PLUGIN: sections of the configuration file. The
+        generic-command and generic-clean types are available by default.
+
+        Args:
+            name (str): The value of the 'type' property used to declare a plugin of this type.
+            factory (PluginFactory): A function, or class, accepting the name and help text of the declared plugin
+                and returning a new plugin.
+        """
+
+        self._plugin_types[name.lower()] = factory
+        return self
+
+    def remote_workers(self, *addresses: str, token: str = '') -> BuildConfiguration:
+        """
+        Executes the process based commands, such as those of the GenericCommandPlugin, on the remote workers at the
+        provided host:port addresses instead of on the local machine. The workers can be started using:
+        python -m buildutils worker --port <port>
+
+        Plugins are still executed one at a time so the workers offload and fail over the commands rather than run
+        them in parallel.
+
+        Args:
+            addresses (str): The host:port address of each worker.
+            token (str): The secret the workers were started with.
+        """
+
+        self._dispatcher = RemoteDispatcher(list(addresses), token) if len(addresses) > 0 else None
         return self
 
     def plugins(self, *plugins: Plugin) -> BuildConfiguration:
         self._plugins = plugins
-        self._validate_plugins(*plugins)
+        self._index_plugins(*plugins)
         return self
 
-    def _validate_plugins(self, *plugins: Plugin):
-        names = set()
+    def _clear_config_cache(self):
+        self._config_parser = None
+        self._declarations = None
+        self._declared_plugins = {}
+
+    def _index_plugins(self, *plugins: Plugin):
+        self._plugin_index = {}
         for plugin in plugins:
-            if plugin.name in names:
+            name = normalize_plugin_name(plugin.name)
+            if name in self._plugin_index:
                 raise ValueError(f'Two or more plugins tried to register under the same name of: [{plugin.name}]')
-            names.add(plugin.name)
+            self._plugin_index[name] = plugin
+
+    def _get_declarations(self) -> Dict[str, PluginDeclaration]:
+        if self._declarations is None:
+            self._declarations = {}
+            if os.path.isfile(self._config_file):
+                self._declarations = read_plugin_declarations(self._load_config_parser())
+            for name in self._declarations.keys():
+                if name in self._plugin_index:
+                    raise ValueError(f'A plugin declared in the config file has the same name as a registered plugin: [{name}]')
+        return self._declarations
 
     def _read_plugins_from_profile(self, profile: str | None) -> List[str]:
         if profile is None:
@@ -60,7 +138,9 @@ class BuildConfiguration:
             raise PropertyMissingException(profile_section_name, 'plugins')
         return profile_section['plugins'].split(',')
 
-    def build(self, profile: str | None = None, plugins: str | None = None, list_plugins=False):
+    def build(self, profile: str | None = None, plugins: str | None = None, list_plugins=False,
+              profile_commands: str | None = None, profile_mode: str = CommandProfiler.MODE_ALL, resume: bool = False,
+              plan: bool = False, jobs: int = 1):
         """
         Execute the build plugins in the specified order. The order in which the plugins will be executed will be
         determined in the following way.
@@ -78,13 +158,42 @@ class BuildConfiguration:
             plugins (str): An optional comma delimited list of plugins to execute. The order in which the plugins will
                 be executed will match the order in which the names appear in this parameter.
             list_plugins (bool): If True this will print the plugins and their default execution order then exit.
+            profile_commands (str): An optional comma delimited list of the names of the in-process commands, or *
+                for all of them, that should be profiled. Only commands created through as_command or as_plugin can
+                be profiled. When not provided no profiling overhead is incurred.
+            profile_mode (str): Specifies what the selected commands should be profiled for. Can be cpu, memory,
+                or all.
+            resume (bool): If True the plugins that completed successfully in the previous build, and whose input
+                files have not changed since, will be skipped so the build resumes from the plugin that failed.
+            plan (bool): If True this will print the expected duration of each plugin, based on the timings recorded
+                by previous builds, along with the critical path and the minimum wall time of the build then exit.
+            jobs (int): The number of plugins the plan should assume can be executed at the same time.
         """
 
         print(f'Using configuration file: [{self._config_file}]')
+        # The configuration file may have been edited since a previous build of this configuration so it is always
+        # read again, and the declared plugins created again, rather than reused from that build.
+        self._clear_config_cache()
         plugins_to_execute = self._get_plugins_to_execute(profile, plugins)
         if list_plugins:
             return self.print_available_plugins(plugins_to_execute)
-        self._build(plugins_to_execute)
+        if plan:
+            return self.print_plan(plugins_to_execute, jobs)
+        profiler = CommandProfiler(profile_commands, profile_mode) if profile_commands is not None else None
+        set_active_profiler(profiler)
+        set_active_dispatcher(self._dispatcher)
+        context = BuildContext(self._load_config_parser)
+        set_build_context(context)
+        try:
+            self._build(plugins_to_execute, resume)
+            context.save()
+        finally:
+            set_active_profiler(None)
+            set_active_dispatcher(None)
+            set_build_context(None)
+            clear_exported_environment_variables()
+            if profiler is not None:
+                profiler.print_summary()
 
     def _get_plugins_to_execute(self, profile: str | None, plugins: str | None) -> List[str]:
         plugins_to_execute = self._read_plugins_from_profile(profile)
@@ -100,13 +209,37 @@ class BuildConfiguration:
         print('Using all available plugins in registered order.')
         return self.get_plugin_names()
 
-    def _build(self, plugins_to_execute: List[str]):
+    def _build(self, plugins_to_execute: List[str], resume: bool):
         print(f'Executing provided plugins: [{plugins_to_execute}]')
-        self._load_config(plugins_to_execute)
-        self._execute_plugins(plugins_to_execute)
+        config = self._load_config(plugins_to_execute)
+        sections = {section.lower(): section for section in config.sections()}
+        checkpoint = self._create_checkpoint(config, sections, plugins_to_execute)
+        if resume:
+            checkpoint.load()
+        timings = BuildTimings()
+        try:
+            self._execute_plugins(config, sections, plugins_to_execute, checkpoint, timings)
+        except BaseException:
+            # Failed plugins stop the build through sys.exit so the fingerprints are recorded for any early exit.
+            checkpoint.record_fingerprints()
+            raise
+        finally:
+            timings.save()
+        checkpoint.clear()
+
+    def _create_checkpoint(self, config: ConfigParser, sections: Dict[str, str], plugins_to_execute: List[str]) -> BuildCheckpoint:
+        input_patterns = {}
+        for plugin_name in plugins_to_execute:
+            plugin = self._get_plugin_with_name(plugin_name)
+            input_patterns[plugin.name] = BuildCheckpoint.read_input_patterns(self._get_plugin_section(config, sections, plugin))
+        return BuildCheckpoint(self._config_file, plugins_to_execute, input_patterns)
+
+    def _get_plugin_section(self, config: ConfigParser, sections: Dict[str, str], plugin: Plugin) -> SectionProxy | None:
+        section_name = sections.get(plugin.section_name.lower())
+        return config[section_name] if section_name is not None else None
 
     def get_plugin_names(self) -> List[str]:
-        return [plugin.name.lower() for plugin in self._plugins]
+        return [plugin.name.lower() for plugin in self._plugins] + list(self._get_declarations().keys())
 
     def print_available_plugins(self, plugin_names: List[str]):
         print('List of available plugins:')
@@ -117,38 +250,94 @@ class BuildConfiguration:
                 raise PluginNotFoundException(plugin_name)
             print(str(plugin))
 
+    def print_plan(self, plugin_names: List[str], jobs: int):
+        config = self._load_config_parser()
+        sections = {section.lower(): section for section in config.sections()}
+        timings = BuildTimings()
+        steps: List[PlannedStep] = []
+        for plugin_name in plugin_names:
+            plugin = self._get_plugin_with_name(plugin_name)
+            if plugin is None:
+                raise PluginNotFoundException(plugin_name)
+            previous_step = steps[-1].name if len(steps) > 0 else None
+            planned_names = {step.name for step in steps}
+            dependencies = []
+            for dependency in read_dependencies(self._get_plugin_section(config, sections, plugin), previous_step):
+                dependency = normalize_plugin_name(dependency)
+                if dependency not in planned_names:
+                    print(f'Ignoring dependency of [{plugin.name}] on [{dependency}] as it is not executed before it.')
+                    continue
+                dependencies.append(dependency)
+            steps.append(PlannedStep(plugin.name, timings.expected_duration(plugin.name), dependencies))
+        BuildPlan(steps, jobs).print_report()
+
     def _load_config_parser(self) -> ConfigParser:
+        if self._config_parser is not None:
+            return self._config_parser
         if not os.path.isfile(self._config_file):
             raise ConfigNotFoundException(self._config_file)
 
         config = ConfigParser()
+        config.read_dict(self._config_defaults)
         config.read(self._config_file)
+        self._config_parser = config
         return config
 
-    def _load_config(self, plugins_to_execute: List[str]):
+    def _load_config(self, plugins_to_execute: List[str]) -> ConfigParser:
         config = self._load_config_parser()
         for plugin_name in plugins_to_execute:
             plugin = self._get_plugin_with_name(plugin_name)
             if plugin is None:
                 raise PluginNotFoundException(plugin_name)
             print(f'Loading config for plugin: [{plugin.name}]')
+            plugin.reset_commands()
             plugin.load_config(config)
+        return config
 
     def _get_plugin_with_name(self, plugin_name: str) -> Plugin | None:
-        return next((plugin for plugin in self._plugins if plugin.name.lower() == plugin_name.lower()), None)
+        name = normalize_plugin_name(plugin_name)
+        plugin = self._plugin_index.get(name) or self._declared_plugins.get(name)
+        if plugin is not None:
+            return plugin
 
-    def _execute_plugins(self, plugins_to_execute: List[str]):
+        declaration = self._get_declarations().get(name)
+        if declaration is None:
+            return None
+        # Declared plugins are only created once they have been selected and are then cached until the configuration
+        # is read again.
+        plugin = declaration.create(self._load_config_parser(), self._plugin_types)
+        self._declared_plugins[name] = plugin
+        return plugin
+
+    def _execute_plugins(self, config: ConfigParser, sections: Dict[str, str], plugins_to_execute: List[str], checkpoint: BuildCheckpoint,
+                         timings: BuildTimings):
         for plugin_name in plugins_to_execute:
             plugin = self._get_plugin_with_name(plugin_name)
             if plugin is None:
                 raise PluginNotFoundException(plugin_name)
+            if checkpoint.can_skip(plugin.name):
+                print(f'\n--------------- Skipping Plugin: {plugin.name} (completed in previous build) ---------------')
+                checkpoint.mark_completed(plugin.name)
+                continue
             try:
                 print(f'\n--------------- Running Plugin: {plugin.name} ---------------')
-                if not plugin.execute():
+                start_time = time.perf_counter()
+                if not self._execute_plugin(plugin, ScratchWorkspace.from_section(plugin.name, self._get_plugin_section(config, sections, plugin))):
                     print(f'Plugin [{plugin.name}] reported failure. Stopping build')
                     sys.exit(1)
+                timings.record(plugin.name, time.perf_counter() - start_time)
+                checkpoint.mark_completed(plugin.name)
                 print('--------------- ---------------')
             except Exception as e:
                 print(f'An uncaught exception occurred while executing plugin [{plugin.name}]')
                 print(e)
                 sys.exit(1)
+
+    def _execute_plugin(self, plugin: Plugin, scratch: ScratchWorkspace | None) -> bool:
+        if scratch is None:
+            return plugin.execute()
+        scratch.enter()
+        try:
+            return plugin.execute()
+        finally:
+            scratch.exit()
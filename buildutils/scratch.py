@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+from configparser import SectionProxy
+import os
+import shutil
+import tempfile
+
+from buildutils.commands import (
+    FileCleanupCommand,
+    export_environment_variable,
+    get_exported_environment_variable,
+    remove_exported_environment_variable
+)
+
+
+class ScratchWorkspace:
+
+    """A temporary workspace, within a RAM backed directory, that the I/O heavy outputs of a plugin are written to
+    while the plugin executes.
+
+    The workspace is enabled by setting the 'scratch' property within the plugin's section of the configuration file
+    to tmpfs. The section can also contain the 'scratch_directory', 'scratch_outputs', and 'scratch_env_' prefixed
+    properties. For example:
+
+    [COVERAGE]
+    scratch = tmpfs
+    scratch_outputs = htmlcov/
+    scratch_env_COVERAGE_FILE = .coverage
+
+    scratch_directory: The RAM backed directory the workspace is created in. Defaults to /dev/shm. When the directory
+    does not exist the system temporary directory is used instead.
+
+    scratch_outputs: A comma delimited list of the files and directories, relative to the working directory, the
+    plugin writes to. Directories must end with a /. Each output is moved into the workspace and replaced with a
+    symbolic link to it before the plugin executes, so the tools write to the workspace without being reconfigured,
+    and is copied back once the plugin completes.
+
+    scratch_env_<VARIABLE>: A path, relative to the workspace output directory, exported to the subprocesses of the
+    plugin through the environment variable <VARIABLE>. This allows pointing tools that read their output paths from
+    the environment at the workspace. It should be used for files, like the coverage data file, that tools delete and
+    recreate since that replaces the symbolic link of an output. Unless also listed as an output the file is not copied
+    back.
+
+    The TMPDIR, TEMP, and TMP variables of the plugin's subprocesses are always pointed at the workspace. Once the
+    plugin completes the workspace is deleted.
+    """
+
+    MODE_TMPFS = 'tmpfs'
+    MODE_NONE = 'none'
+
+    _MODE_PROPERTY = 'scratch'
+    _DIRECTORY_PROPERTY = 'scratch_directory'
+    _OUTPUTS_PROPERTY = 'scratch_outputs'
+    _VARIABLE_PREFIX = 'scratch_env_'
+    _DEFAULT_DIRECTORY = '/dev/shm'
+    _TEMP_VARIABLES = ['TMPDIR', 'TEMP', 'TMP']
+
+    def __init__(self, plugin_name: str, ram_directory: str, outputs: List[str], variables: Dict[str, str]):
+        """
+        Initializes the scratch workspace.
+
+        Args:
+            plugin_name (str): The name of the plugin the workspace is created for.
+            ram_directory (str): The RAM backed directory the workspace will be created in.
+            outputs (List[str]): The files and directories, with directories ending in a /, to place in the workspace.
+            variables (Dict[str, str]): The environment variables to export keyed by name with paths, relative to the
+                workspace output directory, as values.
+        """
+
+        self._plugin_name = plugin_name
+        self._ram_directory = ram_directory
+        self._outputs = outputs
+        self._variables = variables
+        self._directory: str | None = None
+        self._linked_outputs: List[Tuple[str, str]] = []
+        self._previous_variables: Dict[str, str | None] = {}
+
+    @staticmethod
+    def from_section(plugin_name: str, section: SectionProxy | None) -> ScratchWorkspace | None:
+        """
+        Creates the scratch workspace configured within a plugin's config section.
+
+        Returns:
+            The workspace or None if the section does not enable a scratch workspace.
+        """
+
+        if section is None:
+            return None
+        mode = section.get(ScratchWorkspace._MODE_PROPERTY, ScratchWorkspace.MODE_NONE).strip().lower()
+        if mode == ScratchWorkspace.MODE_NONE:
+            return None
+        if mode != ScratchWorkspace.MODE_TMPFS:
+            raise ValueError(f'Unsupported scratch mode of: [{mode}]. Expected one of [tmpfs, none].')
+
+        ram_directory = section.get(ScratchWorkspace._DIRECTORY_PROPERTY, ScratchWorkspace._DEFAULT_DIRECTORY).strip()
+        outputs = [output.strip() for output in section.get(ScratchWorkspace._OUTPUTS_PROPERTY, '').split(',') if output.strip() != '']
+        variables = {
+            name[len(ScratchWorkspace._VARIABLE_PREFIX):].upper(): value.strip()
+            for (name, value) in section.items() if name.lower().startswith(ScratchWorkspace._VARIABLE_PREFIX)
+        }
+        return ScratchWorkspace(plugin_name, ram_directory, outputs, variables)
+
+    def enter(self):
+        """
+        Creates the workspace, moves the outputs into it, and exports the environment variables. If any of these steps
+        fail the outputs already moved and the variables already exported are restored before the error is raised.
+        """
+
+        ram_directory = self._ram_directory
+        if not os.path.isdir(ram_directory):
+            ram_directory = tempfile.gettempdir()
+            print(f'Scratch directory [{self._ram_directory}] does not exist. Using [{ram_directory}] instead.')
+        self._directory = tempfile.mkdtemp(prefix=f'buildutils-{self._plugin_name}-', dir=ram_directory)
+        print(f'Using scratch workspace [{self._directory}] for plugin [{self._plugin_name}]')
+        try:
+            self._prepare()
+        except BaseException:
+            self.exit()
+            raise
+
+    def _prepare(self):
+        temp_directory = os.path.join(self._directory, 'tmp')
+        output_directory = os.path.join(self._directory, 'outputs')
+        os.makedirs(temp_directory)
+        os.makedirs(output_directory)
+
+        variables = {name: temp_directory for name in ScratchWorkspace._TEMP_VARIABLES}
+        for (name, path) in self._variables.items():
+            variables[name] = os.path.join(output_directory, path)
+            os.makedirs(os.path.dirname(variables[name]), exist_ok=True)
+        for (name, value) in variables.items():
+            self._previous_variables[name] = get_exported_environment_variable(name)
+            export_environment_variable(name, value)
+
+        for output in self._outputs:
+            self._link_output(output, output_directory)
+
+    def exit(self):
+        """
+        Copies the outputs back to the working directory, restores the environment variables, and deletes the
+        workspace.
+        """
+
+        for (path, target) in self._linked_outputs:
+            if os.path.islink(path) and os.readlink(path) == target:
+                os.remove(path)
+            elif os.path.lexists(path):
+                print(f'Output [{path}] was replaced while the plugin executed and will not be copied back from the scratch workspace.')
+                continue
+            if os.path.isdir(target):
+                shutil.copytree(target, path)
+            elif os.path.isfile(target):
+                shutil.copy2(target, path)
+        self._linked_outputs = []
+
+        for (name, value) in self._previous_variables.items():
+            if value is None:
+                remove_exported_environment_variable(name)
+            else:
+                export_environment_variable(name, value)
+        self._previous_variables = {}
+
+        FileCleanupCommand(f'scratch-cleanup-{self._plugin_name}', [self._directory]).execute()
+        self._directory = None
+
+    def _link_output(self, output: str, output_directory: str):
+        is_directory = output.endswith('/') or output.endswith('\\')
+        path = output.rstrip('/\\')
+        target = os.path.join(output_directory, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        if os.path.islink(path):
+            os.remove(path)
+        elif os.path.isdir(path):
+            shutil.copytree(path, target)
+            shutil.rmtree(path)
+        elif os.path.isfile(path):
+            shutil.copy2(path, target)
+            os.remove(path)
+        # Recorded as soon as the output has been moved so exit copies it back even if linking it fails part way.
+        self._linked_outputs.append((path, target))
+        if is_directory and not os.path.isdir(target):
+            os.makedirs(target)
+
+        if os.path.dirname(path) != '':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.symlink(target, path, target_is_directory=is_directory)
+        except OSError as e:
+            print(f'Could not link output [{path}] to the scratch workspace, it will be written in place: [{e}]')
+            self._linked_outputs.pop()
+            if os.path.isdir(target):
+                shutil.copytree(target, path)
+            elif os.path.isfile(target):
+                shutil.copy2(target, path)
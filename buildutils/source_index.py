@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from typing import Dict, List, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import fnmatch
+import hashlib
+import json
+import os
+
+from buildutils.commands import matrix_artifact_path
+
+
+_READ_CHUNK_SIZE = 1024 * 1024
+_INDEX_VERSION = 1
+
+DEFAULT_IGNORE_PATTERNS = [
+    '.git', '.hg', '.svn', '.tox', '.venv', 'venv', '__pycache__', '.pycache', '.mypy_cache', '*.egg-info',
+    'build', 'dist', 'htmlcov', 'build-profiles', 'build-matrix', '.dmypy.json*', '.buildutils-*'
+]
+
+
+class SourceEntry:
+
+    """
+    A single file within the source index. The content hash is only computed the first time it is requested and is
+    carried over from the previous build when the size and modification time of the file have not changed.
+    """
+
+    def __init__(self, root: str, path: str, size: int, mtime_ns: int, changed: bool, content_hash: str | None = None):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.changed = changed
+        self._root = root
+        self._content_hash = content_hash
+
+    @property
+    def absolute_path(self) -> str:
+        return os.path.join(self._root, *self.path.split('/'))
+
+    @property
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            with open(self.absolute_path, 'rb') as file:
+                for chunk in iter(lambda: file.read(_READ_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def __repr__(self) -> str:
+        return self.path
+
+
+class SourceIndex:
+
+    """An index of the files within the project shared by every plugin of a build so the source tree only needs to be
+    walked once per build.
+
+    The tree is walked in parallel with each directory scanned on a thread pool. The index is persisted between builds
+    so the content hashes of unchanged files do not need to be computed again and so the files that have been added
+    or modified since the index was last saved can be queried.
+
+    The paths within the index are relative to the root directory and always use / as the separator.
+    """
+
+    _FILE_NAME = '.buildutils-source-index.json'
+
+    def __init__(self, root: str = '.', ignore_patterns: List[str] | None = None, workers: int | None = None):
+        """
+        Initializes the source index.
+
+        Args:
+            root (str): The directory to index.
+            ignore_patterns (List[str]): Glob patterns matched against the name and the relative path of each file
+                and directory. Matching files are not indexed and matching directories are not walked.
+            workers (int): The number of threads used to walk the tree.
+        """
+
+        self._root = os.path.abspath(root)
+        self._ignore_patterns = ignore_patterns if ignore_patterns is not None else list(DEFAULT_IGNORE_PATTERNS)
+        self._workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self._file_name = matrix_artifact_path(SourceIndex._FILE_NAME)
+        self._entries: Dict[str, SourceEntry] = {}
+        self._removed: List[str] = []
+        self._previous_paths: Set[str] = set()
+
+    def refresh(self, directory: str | None = None):
+        """
+        Walks the tree and compares each file against the index saved by the previous build.
+
+        Args:
+            directory (str): An optional directory, relative to the root using / as the separator, to walk again
+                instead of the whole tree. This picks up the files that earlier plugins of the same build have added,
+                modified, or removed within the directory, while reusing the content hashes of the files that have not
+                changed since they were last indexed.
+        """
+
+        if directory is not None:
+            self._refresh_directory(directory.strip('/'))
+            return
+        previous = self._read_previous()
+        self._entries = {}
+        for (path, (size, mtime_ns)) in self._walk().items():
+            previous_entry = previous.get(path)
+            if previous_entry is not None and previous_entry[0] == size and previous_entry[1] == mtime_ns:
+                self._entries[path] = SourceEntry(self._root, path, size, mtime_ns, False, previous_entry[2])
+            else:
+                self._entries[path] = SourceEntry(self._root, path, size, mtime_ns, True)
+        self._removed = sorted(path for path in previous.keys() if path not in self._entries)
+        self._previous_paths = set(previous.keys())
+        changed_count = sum(1 for entry in self._entries.values() if entry.changed)
+        print(f'Indexed [{len(self._entries)}] source files of which [{changed_count}] changed and [{len(self._removed)}] were removed')
+
+    def save(self):
+        """
+        Persists the index, including any content hashes computed during the build, for the next build.
+        """
+
+        document = {
+            'version': _INDEX_VERSION,
+            'root': self._root,
+            'ignore': self._ignore_patterns,
+            'entries': {path: [entry.size, entry.mtime_ns, entry._content_hash] for (path, entry) in self._entries.items()},
+        }
+        with open(self._file_name, 'w') as file:
+            json.dump(document, file)
+
+    @property
+    def root(self) -> str:
+        return self._root
+
+    def get(self, path: str) -> SourceEntry | None:
+        return self._entries.get(path)
+
+    def relative_path(self, path: str) -> str | None:
+        """
+        Converts a path, relative to the current directory or absolute, to the form used by the index.
+
+        Returns:
+            The path relative to the root using / as the separator or None if the path is not within the root.
+        """
+
+        relative_path = os.path.relpath(os.path.abspath(path), self._root)
+        if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep) or os.path.isabs(relative_path):
+            return None
+        return '' if relative_path == os.curdir else relative_path.replace(os.sep, '/')
+
+    def files(self, patterns: str | List[str] = '*', directory: str | None = None, changed_only: bool = False) -> List[SourceEntry]:
+        """
+        Queries the files within the index.
+
+        Args:
+            patterns (str | List[str]): One or more glob patterns the relative path of a file must match. A * also
+                matches the / separator and a **/ matches zero or more directories.
+            directory (str): An optional directory, relative to the root, the files must be within.
+            changed_only (bool): If True only the files added or modified since the previous build are returned.
+
+        Returns:
+            The matching entries sorted by path.
+        """
+
+        patterns = [patterns] if isinstance(patterns, str) else patterns
+        prefix = directory.replace(os.sep, '/').strip('/') + '/' if directory is not None and directory not in ['', '.'] else ''
+        matches = []
+        for (path, entry) in self._entries.items():
+            if changed_only and not entry.changed:
+                continue
+            if not path.startswith(prefix):
+                continue
+            if any(_matches(path, pattern) for pattern in patterns):
+                matches.append(entry)
+        return sorted(matches, key=lambda entry: entry.path)
+
+    def changed_files(self, patterns: str | List[str] = '*', directory: str | None = None) -> List[SourceEntry]:
+        return self.files(patterns, directory, changed_only=True)
+
+    def removed_files(self) -> List[str]:
+        return list(self._removed)
+
+    def fingerprint(self, paths: List[str], extra_values: List[str] | None = None) -> str:
+        """
+        Computes a SHA-256 digest from the path and content hash of each file along with any additional values
+        provided. Unlike the fingerprint command helper the contents of files that have not changed since the previous
+        build are not read again.
+
+        Files that are not in the index are included in the digest as missing so that creating or deleting one of the
+        files will produce a different fingerprint.
+
+        Args:
+            paths (List[str]): The paths, relative to the root and using / as the separator, of the files to include.
+            extra_values (List[str]): Additional values, such as the interpreter version, to include in the fingerprint.
+
+        Returns:
+            The hex encoded digest.
+        """
+
+        digest = hashlib.sha256()
+        for path in paths:
+            digest.update(path.encode('utf-8'))
+            entry = self._entries.get(path)
+            digest.update(b'\0missing\0' if entry is None else entry.content_hash.encode('utf-8'))
+            digest.update(b'\0')
+        for value in extra_values or []:
+            digest.update(value.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _read_previous(self) -> Dict[str, list]:
+        if not os.path.isfile(self._file_name):
+            return {}
+        try:
+            with open(self._file_name, 'r') as file:
+                document = json.load(file)
+        except (OSError, ValueError):
+            print(f'Could not read the source index [{self._file_name}]. All files will be treated as changed.')
+            return {}
+        if document.get('version') != _INDEX_VERSION or document.get('root') != self._root or document.get('ignore') != self._ignore_patterns:
+            return {}
+        return document['entries']
+
+    def _refresh_directory(self, directory: str):
+        prefix = directory + '/' if directory != '' else ''
+        files = self._walk(directory)
+        for path in [path for path in self._entries.keys() if path.startswith(prefix) and path not in files]:
+            del self._entries[path]
+            if path in self._previous_paths:
+                self._removed.append(path)
+        for (path, (size, mtime_ns)) in files.items():
+            entry = self._entries.get(path)
+            if entry is None or entry.size != size or entry.mtime_ns != mtime_ns:
+                self._entries[path] = SourceEntry(self._root, path, size, mtime_ns, True)
+        self._removed.sort()
+
+    def _walk(self, directory: str = '') -> Dict[str, Tuple[int, int]]:
+        files: Dict[str, Tuple[int, int]] = {}
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            pending = {executor.submit(self._scan_directory, directory)}
+            while len(pending) > 0:
+                (done, pending) = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    (directory_files, directories) = future.result()
+                    files.update(directory_files)
+                    pending.update(executor.submit(self._scan_directory, directory) for directory in directories)
+        return files
+
+    def _scan_directory(self, directory: str) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+        files: Dict[str, Tuple[int, int]] = {}
+        directories: List[str] = []
+        try:
+            with os.scandir(os.path.join(self._root, directory)) as entries:
+                for entry in entries:
+                    path = f'{directory}/{entry.name}' if directory != '' else entry.name
+                    if self._is_ignored(entry.name, path):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError as e:
+            print(f'Could not index directory [{directory}]: [{e}]')
+        return (files, directories)
+
+    def _is_ignored(self, name: str, path: str) -> bool:
+        return any(fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(path, pattern) for pattern in self._ignore_patterns)
+
+
+def _matches(path: str, pattern: str) -> bool:
+    # A **/ matches zero or more directories as it does for a recursive glob.
+    return fnmatch.fnmatchcase(path, pattern) or ('**/' in pattern and fnmatch.fnmatchcase(path, pattern.replace('**/', '')))
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import Dict, List
+import json
+import os
+import statistics
+
+from buildutils.commands import matrix_artifact_path
+
+
+class BuildTimings:
+
+    """
+    Records how long each plugin took to execute across builds so the duration of future builds can be estimated.
+
+    Only the durations of plugins that completed successfully are recorded and only the most recent durations of each
+    plugin are kept so the estimates follow changes to the project.
+    """
+
+    _FILE_NAME = '.buildutils-timings.json'
+    _MAX_SAMPLES = 10
+
+    def __init__(self):
+        self._file_name = matrix_artifact_path(BuildTimings._FILE_NAME)
+        self._samples: Dict[str, List[float]] = self._read()
+
+    def record(self, plugin_name: str, duration: float):
+        samples = self._samples.setdefault(plugin_name, [])
+        samples.append(round(duration, 4))
+        del samples[:-BuildTimings._MAX_SAMPLES]
+
+    def expected_duration(self, plugin_name: str) -> float | None:
+        """
+        Gets the median of the recorded durations of the plugin.
+
+        Returns:
+            The expected duration in seconds or None if the plugin has never completed.
+        """
+
+        samples = self._samples.get(plugin_name)
+        if samples is None or len(samples) == 0:
+            return None
+        return statistics.median(samples)
+
+    def sample_count(self, plugin_name: str) -> int:
+        return len(self._samples.get(plugin_name, []))
+
+    def save(self):
+        with open(self._file_name, 'w') as file:
+            json.dump(self._samples, file, indent=2)
+
+    def _read(self) -> Dict[str, List[float]]:
+        if not os.path.isfile(self._file_name):
+            return {}
+        try:
+            with open(self._file_name, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            print(f'Could not read the recorded plugin timings from [{self._file_name}].')
+            return {}
@@ -18,5 +18,10 @@ if __name__ == '__main__':
         ],
         install_requires=[
             'beautifulsoup4==4.12.3'
-        ]
+        ],
+        entry_points={
+            'console_scripts': [
+                'buildutils=buildutils.__main__:main'
+            ]
+        }
     )